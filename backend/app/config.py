@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
@@ -18,12 +20,22 @@ class Settings(BaseSettings):
         default="sqlite+aiosqlite:///./monite.db",
         description="SQLAlchemy database connection string."
     )
+    # Connection pool for server databases (PostgreSQL, MySQL...). SQLite
+    # keeps its own small pool since writes are serialized anyway.
+    db_pool_size: int = Field(default=20, description="Persistent connections kept in the pool")
+    db_max_overflow: int = Field(default=20, description="Extra connections allowed under load")
+    db_pool_timeout: int = Field(default=10, description="Seconds to wait for a free connection")
 
     # Telegram
     telegram_token: str | None = Field(default=None)
     telegram_chat_id: str | None = Field(default=None)
     telegram_cooldown_seconds: int = Field(default=900)
 
+    # Salidas grandes de acciones (stdout / response_parsed) se guardan
+    # comprimidas en disco; en la tabla queda solo {"@file": nombre}.
+    run_output_dir: str = Field(default="./data/runs", description="Directory for large action outputs")
+    run_output_inline_max_bytes: int = Field(default=8192, description="Outputs above this size go to run_output_dir")
+
     # API
     api_base_path: str = Field(default="/api")
 
@@ -49,4 +61,8 @@ class Settings(BaseSettings):
     telegram_expiring_days: int = Field(default=3, description="Umbral vigencia baja en días")
     telegram_low_balance: float | None = Field(default=None, description="Umbral saldo bajo (None desactiva)")
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, built on first use."""
+    return Settings()
@@ -5,23 +5,34 @@ Fixes for SQLite concurrency:
 - busy_timeout
 - connect timeout
 - rollback on exceptions
+- small bounded connection pool (PRAGMAs run once per connection)
+
+Pools are LIFO, so steady polling keeps reusing the same few warm
+connections (per-connection SQLite page cache, server-side caches) and
+the rest idle out. SQLite: 5 + 10 overflow. Server databases:
+``MONITE_DB_POOL_SIZE`` (20) + ``MONITE_DB_MAX_OVERFLOW`` (20), waiting
+up to ``MONITE_DB_POOL_TIMEOUT`` (10 s) for a free connection, with
+pre-ping and 30 min recycling.
 """
 
 from __future__ import annotations
 
 import logging
+from typing import AsyncIterator
 
-from sqlalchemy import event
+import orjson
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from .config import settings
+from .config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
 def _make_engine():
+    settings = get_settings()
     url = settings.database_url
 
     # ✅ SQLite async: configurar para concurrencia más estable
@@ -30,34 +41,60 @@ def _make_engine():
             url,
             echo=False,
             future=True,
-            poolclass=NullPool,  # evita reuso de conexiones en sqlite (reduce locks)
+            # Pool pequeño: reutiliza conexiones en vez de abrir/cerrar el
+            # fichero SQLite (y re-ejecutar los PRAGMAs) en cada sesión.
+            pool_size=5,
+            max_overflow=10,
+            pool_use_lifo=True,
+            pool_recycle=1800,
+            pool_pre_ping=False,
+            # Columnas JSON (response_parsed) se leen con orjson
+            json_deserializer=orjson.loads,
             connect_args={
                 "check_same_thread": False,
                 "timeout": 30,  # espera hasta 30s por locks
             },
         )
 
-    # Otros motores: pool normal
+    # Otros motores: pool asíncrono dimensionado por configuración, para que
+    # scheduler y API concurrentes no esperen en pool.acquire().
     return create_async_engine(
         url,
         echo=False,
         future=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        json_deserializer=orjson.loads,
     )
 
 
 engine = _make_engine()
 
 
-# ✅ PRAGMAs SQLite: WAL + busy_timeout
-if settings.database_url.startswith("sqlite+aiosqlite"):
+# ✅ PRAGMAs SQLite: WAL + busy_timeout + caché/mmap
+# Se ejecutan solo al abrir una conexión nueva del pool.
+if get_settings().database_url.startswith("sqlite+aiosqlite"):
+
+    # Un solo executescript (journal_mode primero; sus filas se descartan).
+    _SQLITE_PRAGMAS = (
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA busy_timeout=30000;"  # 30s
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA cache_size=-65536;"  # 64 MiB de caché de páginas
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA mmap_size=268435456;"  # 256 MiB
+    )
 
     @event.listens_for(engine.sync_engine, "connect")
     def _set_sqlite_pragmas(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL;")
-        cursor.execute("PRAGMA busy_timeout=30000;")  # 30s
-        cursor.execute("PRAGMA synchronous=NORMAL;")
-        cursor.close()
+        # El adaptador aiosqlite no expone executescript; run_async nos da
+        # la conexión aiosqlite real.
+        dbapi_connection.run_async(lambda conn: conn.executescript(_SQLITE_PRAGMAS))
 
 
 AsyncSessionLocal = sessionmaker(
@@ -69,19 +106,70 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+# Índices sustituidos por otros compuestos; se borran de bases existentes.
+_RETIRED_INDEXES = (
+    "ix_host_health_host_id",  # -> ix_host_health_host_checked
+    "ix_action_runs_host_started",  # -> ix_action_runs_host_started_id
+)
+
+
+# Rellena las columnas last_action_* de hosts al añadirlas a una base ya
+# existente; después las mantiene execute_and_record.
+_BACKFILL_LAST_ACTION = """
+UPDATE hosts SET
+    last_action_key = (SELECT r.action_key FROM action_runs r WHERE r.host_id = hosts.id
+                       ORDER BY r.started_at DESC, r.id DESC LIMIT 1),
+    last_action_at = (SELECT r.started_at FROM action_runs r WHERE r.host_id = hosts.id
+                      ORDER BY r.started_at DESC, r.id DESC LIMIT 1),
+    last_action_status = (SELECT r.status FROM action_runs r WHERE r.host_id = hosts.id
+                          ORDER BY r.started_at DESC, r.id DESC LIMIT 1)
+"""
+
+
+def _add_missing_columns(sync_conn) -> set:
+    """ALTER TABLE ADD COLUMN for nullable model columns an existing table lacks."""
+    inspector = inspect(sync_conn)
+    added = set()
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}")
+            added.add((table.name, column.name))
+            logger.info("Added column %s.%s", table.name, column.name)
+    return added
+
+
+def _create_schema(sync_conn) -> None:
+    Base.metadata.create_all(sync_conn)
+    added = _add_missing_columns(sync_conn)
+    if ("hosts", "last_action_at") in added:
+        sync_conn.exec_driver_sql(_BACKFILL_LAST_ACTION)
+    # create_all solo crea índices junto con tablas nuevas: añadir los que
+    # falten en bases ya existentes.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+    for name in _RETIRED_INDEXES:
+        sync_conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+
 async def init_db() -> None:
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_schema)
         logger.info("Database tables created")
 
 
-async def get_async_session() -> AsyncSession:
-    """FastAPI dependency that yields a DB session (safe rollback)."""
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency that yields a DB session (safe rollback).
+
+    ``async with`` closes the session on exit.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
@@ -6,54 +6,113 @@ outside of the drivers; it simply asks a driver to execute an
 action identified by an ``action_key``. Each driver exposes
 ``execute_action()``, ``list_supported_actions()`` and
 ``validate()``.
+
+Driver modules are imported lazily on first use so that only the
+drivers actually needed (and their dependencies, e.g. ``asyncssh``)
+are loaded.
 """
 
 from __future__ import annotations
 
-from typing import Dict, Type
+import logging
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Type
 
 from .base import RouterDriver
-from .mikrotik_rest import MikroTikRouterOSRestDriver
-from .tplink_openwrt_ssh import TPLinkOpenWrtSSHDriver
 from ..models import RouterType
 
+logger = logging.getLogger(__name__)
+
+
+def _load_mikrotik() -> Type[RouterDriver]:
+    from .mikrotik_rest import MikroTikRouterOSRestDriver
+    return MikroTikRouterOSRestDriver
+
+
+def _load_tplink() -> Type[RouterDriver]:
+    from .tplink_openwrt_ssh import TPLinkOpenWrtSSHDriver
+    return TPLinkOpenWrtSSHDriver
+
 
-_DRIVER_REGISTRY: Dict[str, Type[RouterDriver]] = {
-    RouterType.MIKROTIK_ROUTEROS_REST.value: MikroTikRouterOSRestDriver,
-    RouterType.TP_LINK_OPENWRT_SSH.value: TPLinkOpenWrtSSHDriver,
+_DRIVER_LOADERS: Dict[str, Callable[[], Type[RouterDriver]]] = {
+    sys.intern(RouterType.MIKROTIK_ROUTEROS_REST.value): _load_mikrotik,
+    sys.intern(RouterType.TP_LINK_OPENWRT_SSH.value): _load_tplink,
 }
 
+_MIKROTIK = RouterType.MIKROTIK_ROUTEROS_REST.value
+_TPLINK = RouterType.TP_LINK_OPENWRT_SSH.value
 
-def get_driver(router_type: str):
-    if not router_type:
-        raise KeyError("router_type is empty")
+_ALIAS_NAMES: Dict[str, str] = {
+    # Mikrotik
+    "MIKROTIK": _MIKROTIK,
+    "MIKROTIK_REST": _MIKROTIK,
+    "MIKROTIK_ROUTEROS": _MIKROTIK,
+    "MIKROTIK_ROUTEROS_REST": _MIKROTIK,
+
+    # TP-Link / OpenWrt
+    "TPLINK": _TPLINK,
+    "TP-LINK": _TPLINK,
+    "OPENWRT": _TPLINK,
+    "TP_LINK_OPENWRT_SSH": _TPLINK,
+    "TP-LINK_OPENWRT_SSH": _TPLINK,
+}
+
+# Aliases -> canonical router type, built once (upper and lower case) and
+# read-only; any other spelling goes through _resolve().
+_ALIASES: Mapping[str, str] = MappingProxyType({
+    sys.intern(variant): sys.intern(canonical)
+    for alias, canonical in _ALIAS_NAMES.items()
+    for variant in (alias, alias.lower())
+})
 
-    raw = str(router_type).strip()
-    key = raw.upper()
+# Drivers keep no per-instance state, so one shared instance per type is enough
+_DRIVER_INSTANCES: Dict[str, RouterDriver] = {}
 
-    aliases = {
-        # Mikrotik
-        "MIKROTIK": RouterType.MIKROTIK_ROUTEROS_REST.value,
-        "MIKROTIK_REST": RouterType.MIKROTIK_ROUTEROS_REST.value,
-        "MIKROTIK_ROUTEROS": RouterType.MIKROTIK_ROUTEROS_REST.value,
-        "MIKROTIK_ROUTEROS_REST": RouterType.MIKROTIK_ROUTEROS_REST.value,
 
-        # TP-Link / OpenWrt
-        "TPLINK": RouterType.TP_LINK_OPENWRT_SSH.value,
-        "TP-LINK": RouterType.TP_LINK_OPENWRT_SSH.value,
-        "OPENWRT": RouterType.TP_LINK_OPENWRT_SSH.value,
-        "TP_LINK_OPENWRT_SSH": RouterType.TP_LINK_OPENWRT_SSH.value,
-        "TP-LINK_OPENWRT_SSH": RouterType.TP_LINK_OPENWRT_SSH.value,
-    }
+@lru_cache(maxsize=32)
+def _resolve(router_type: str) -> str:
+    """Normalize a router_type (strip/upper + aliases) to its registry key.
 
-    key = aliases.get(key, key)
+    The result is interned, so registry lookups match by identity.
+    """
+    key = str(router_type).strip().upper()
+    return sys.intern(_ALIASES.get(key, key))
+
+
+def get_driver(router_type: str) -> RouterDriver:
+    if not router_type:
+        raise KeyError("router_type is empty")
+
+    # Exact alias hit first; otherwise strip/upper via the cached _resolve
+    key = _ALIASES.get(router_type) or _resolve(router_type)
+
+    driver = _DRIVER_INSTANCES.get(key)
+    if driver is not None:
+        return driver
 
     try:
-        cls = _DRIVER_REGISTRY[key]
+        loader = _DRIVER_LOADERS[key]
     except KeyError:
-        available = ", ".join(sorted(_DRIVER_REGISTRY.keys()))
+        available = ", ".join(sorted(_DRIVER_LOADERS.keys()))
         raise KeyError(
             f"Unknown router_type '{router_type}'. Normalized '{key}'. Available: {available}"
         )
 
-    return cls()
+    driver = _DRIVER_INSTANCES[key] = loader()()
+    return driver
+
+
+def forget_host(host_id: int) -> None:
+    """Discard cached action results for a host whose settings changed."""
+    RouterDriver.forget_host(host_id)
+
+
+async def close_drivers() -> None:
+    """Release the connections held by every driver loaded so far."""
+    for key, driver in list(_DRIVER_INSTANCES.items()):
+        try:
+            await driver.aclose()
+        except Exception:
+            logger.exception("Failed to close driver %s", key)
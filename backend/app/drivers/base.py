@@ -9,11 +9,19 @@ the future without touching unrelated code.
 from __future__ import annotations
 
 import abc
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
 
 from ..models import Host
 
 
+class _LeaderCancelled(Exception):
+    """The shared call was cancelled; waiters retry on their own."""
+
+
 class RouterDriver(abc.ABC):
     """Base class for router drivers.
 
@@ -22,6 +30,12 @@ class RouterDriver(abc.ABC):
     host configuration.
     """
 
+    # Lecturas en curso y recientes (con su caducidad) por host + destino
+    # (ip, port, usuario) + action_key + params, compartidas por API y
+    # scheduler; ver _coalesced().
+    _inflight: Dict[Tuple[Any, ...], "asyncio.Future[Any]"] = {}
+    _recent: Dict[Tuple[Any, ...], Tuple[float, Any]] = {}
+
     @abc.abstractmethod
     async def execute_action(self, host: Host, action_key: str, **kwargs: Any) -> Dict[str, Any]:
         """Execute a named action on the given host.
@@ -62,3 +76,84 @@ class RouterDriver(abc.ABC):
         (such as fetching a system resource) to ensure the router
         is accessible. Raise an exception if validation fails.
         """
+
+    async def validate_many(self, hosts: List[Host]) -> Optional[Dict[int, Optional[float]]]:
+        """Check reachability of several hosts in one batch.
+
+        Returns ``{host_id: latency_ms}`` with ``None`` latency for
+        hosts that did not answer, or ``None`` when the driver has no
+        batch check; callers then fall back to per-host ``validate``.
+        """
+        return None
+
+    async def _coalesced(
+        self,
+        host: Host,
+        action_key: str,
+        ttl: float,
+        run: Callable[[], Awaitable[Any]],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Run a read-only action once for concurrent identical calls.
+
+        Callers arriving while the action is in flight await the same
+        result, and a successful result is reused for ``ttl`` seconds.
+        Failures are not cached. The key includes the host's address and
+        user, so editing a host never returns the old router's result.
+        Cancelling the caller that runs the action does not cancel the
+        others: they run it again themselves.
+        """
+        try:
+            # Serialización canónica: admite listas/dicts en params
+            params_key = orjson.dumps(params or {}, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            # Parámetros no serializables: sin coalescer
+            return await run()
+        key = (host.id, host.ip, host.port, host.username, action_key, params_key)
+        hit = self._recent.get(key)
+        if hit is not None and time.monotonic() < hit[0]:
+            return hit[1]
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            try:
+                return await asyncio.shield(fut)
+            except _LeaderCancelled:
+                return await self._coalesced(host, action_key, ttl, run, params)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            # Solo se cancela este caller; los que esperaban reintentan
+            fut.set_exception(_LeaderCancelled())
+            fut.exception()
+            raise
+        except Exception as exc:
+            fut.set_exception(exc)
+            fut.exception()  # evita el aviso "never retrieved" si nadie esperaba
+            raise
+        else:
+            now = time.monotonic()
+            # Purga de lo caducado (hosts borrados o editados incluidos)
+            for stale in [k for k, (expires, _) in self._recent.items() if expires <= now]:
+                del self._recent[stale]
+            self._recent[key] = (now + ttl, result)
+            fut.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    @classmethod
+    def forget_host(cls, host_id: int) -> None:
+        """Drop the cached read results of ``host_id`` (host edited or deleted)."""
+        for key in [k for k in cls._recent if k[0] == host_id]:
+            del cls._recent[key]
+
+    async def aclose(self) -> None:
+        """Release connections cached by the driver.
+
+        Called once on application shutdown. Drivers that keep no
+        connections open can rely on this no-op default.
+        """
@@ -4,6 +4,9 @@ This driver communicates with RouterOS's HTTP API, authenticating
 via basic authentication. Only a small subset of the API is used
 for the supported actions.
 
+aiohttp sessions are cached per (ip, port, user) so consecutive actions
+on the same router reuse the keep-alive connection.
+
 Warning: the driver uses basic authentication over HTTP. When
 deploying in production you should enable HTTPS on your routers
 and use a proper certificate.
@@ -12,10 +15,12 @@ and use a proper certificate.
 from __future__ import annotations
 
 import logging
-from contextlib import asynccontextmanager
-from typing import Any, Dict, List
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-import httpx
+import aiohttp
+import ijson
+import orjson
 
 from ..models import Host
 from .base import RouterDriver
@@ -23,6 +28,20 @@ from ..services.logs_parser import parse_ussd_logs
 
 logger = logging.getLogger(__name__)
 
+# Case-insensitive match without allocating a lowercased copy of each message
+_USSD_RE = re.compile(r"ussd", re.IGNORECASE)
+
+
+async def _stream_ussd_entries(response: aiohttp.ClientResponse) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the USSD log records of a streamed ``/log`` JSON array as they are parsed."""
+    async for entry in ijson.items_async(response.content, "item", use_float=True):
+        if (
+            isinstance(entry, dict)
+            and isinstance(entry.get("message"), str)
+            and _USSD_RE.search(entry["message"])
+        ):
+            yield entry
+
 
 class MikroTikRouterOSRestDriver(RouterDriver):
     """Concrete driver for MikroTik RouterOS via REST API."""
@@ -39,69 +58,96 @@ class MikroTikRouterOSRestDriver(RouterDriver):
             self.ACTION_VER_LOGS_USSD,
         ]
 
-    @asynccontextmanager
-    async def _get_client(self, host: Host):
-        """Yield an HTTP client configured for the given host and close it safely."""
-        base_url = f"http://{host.ip}:{host.port}/rest"
-        auth = (host.username, host.password) if (host.username or host.password) else None
-
-        client = httpx.AsyncClient(
-            base_url=base_url,
-            auth=auth,
-            timeout=30.0,
-        )
-        try:
-            yield client
-        finally:
-            await client.aclose()
+    # Shared sessions keyed by (ip, port, user); closed on app shutdown
+    _sessions: Dict[Tuple[str, int, str], aiohttp.ClientSession] = {}
+
+    def _session_for(self, host: Host) -> aiohttp.ClientSession:
+        """Return the cached HTTP session for the given host, creating it once."""
+        key = (host.ip, int(host.port), host.username or "")
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30, connect=5),
+                connector=aiohttp.TCPConnector(limit=64, limit_per_host=4, keepalive_timeout=300),
+                raise_for_status=True,
+            )
+            self._sessions[key] = session
+        return session
+
+    @staticmethod
+    def _url(host: Host, path: str) -> str:
+        return f"http://{host.ip}:{host.port}/rest{path}"
+
+    @staticmethod
+    def _auth(host: Host) -> Optional[aiohttp.BasicAuth]:
+        # Per request, so a password change applies without a new session
+        if host.username or host.password:
+            return aiohttp.BasicAuth(host.username or "", host.password or "")
+        return None
+
+    async def _post_json(self, host: Host, path: str, payload: Dict[str, Any]) -> Any:
+        session = self._session_for(host)
+        async with session.post(self._url(host, path), json=payload, auth=self._auth(host)) as response:
+            return await response.json(loads=orjson.loads, content_type=None)
+
+    async def aclose(self) -> None:
+        """Close every cached HTTP session."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.close()
+
+    # Lecturas que se comparten entre llamadas concurrentes (segundos de reuso)
+    _READ_TTL: Dict[str, float] = {
+        ACTION_CONSULTAR_SALDO: 30.0,
+        ACTION_VER_LOGS_USSD: 5.0,
+    }
 
     async def execute_action(self, host: Host, action_key: str, **kwargs: Any) -> Dict[str, Any]:
         """Execute an action on a MikroTik router.
 
         Returns a dictionary with keys ``raw`` and optionally ``parsed``.
-        Raises an exception if the request fails.
+        Raises an exception if the request fails. Balance and log reads
+        are coalesced per host (see ``RouterDriver._coalesced``).
         """
-        async with self._get_client(host) as client:
-            if action_key == self.ACTION_RECARGAR_SALDO:
-                payload = {
-                    "port": "lte1",
-                    "phone-number": "*133*1*4*4*1#",
-                    "message": "",
-                    "type": "ussd",
-                }
-                response = await client.post("/tool/sms/send", json=payload)
-                response.raise_for_status()
-                return {"raw": response.json()}
-
-            if action_key == self.ACTION_CONSULTAR_SALDO:
-                payload = {
-                    "port": "lte1",
-                    "phone-number": "*222*328#",
-                    "message": "",
-                    "type": "ussd",
-                }
-                response = await client.post("/tool/sms/send", json=payload)
-                response.raise_for_status()
-                return {"raw": response.json()}
-
-            if action_key == self.ACTION_VER_LOGS_USSD:
-                # Fetch logs and filter messages containing 'ussd' (case-insensitive).
-                response = await client.get("/log")
-                response.raise_for_status()
-                logs = response.json()  # RouterOS returns a JSON array of log records
-
-                ussd_logs = [
-                    entry
-                    for entry in logs
-                    if isinstance(entry, dict)
-                    and isinstance(entry.get("message"), str)
-                    and "ussd" in entry["message"].lower()
-                ]
-
-                parsed = parse_ussd_logs(ussd_logs)
-                return {"raw": logs, "parsed": parsed}
-
-            raise ValueError(f"Unsupported action '{action_key}' for MikroTik driver")
+        ttl = self._READ_TTL.get(action_key)
+        if ttl is None:
+            return await self._run_action(host, action_key, **kwargs)
+        return await self._coalesced(
+            host, action_key, ttl, lambda: self._run_action(host, action_key, **kwargs), kwargs
+        )
+
+    async def _run_action(self, host: Host, action_key: str, **kwargs: Any) -> Dict[str, Any]:
+        if action_key == self.ACTION_RECARGAR_SALDO:
+            payload = {
+                "port": "lte1",
+                "phone-number": "*133*1*4*4*1#",
+                "message": "",
+                "type": "ussd",
+            }
+            return {"raw": await self._post_json(host, "/tool/sms/send", payload)}
+
+        if action_key == self.ACTION_CONSULTAR_SALDO:
+            payload = {
+                "port": "lte1",
+                "phone-number": "*222*328#",
+                "message": "",
+                "type": "ussd",
+            }
+            return {"raw": await self._post_json(host, "/tool/sms/send", payload)}
+
+        if action_key == self.ACTION_VER_LOGS_USSD:
+            # Stream the log array (RouterOS returns a JSON array of log records)
+            # and keep only messages containing 'ussd' (case-insensitive), so the
+            # full log is never held in memory.
+            session = self._session_for(host)
+            async with session.get(self._url(host, "/log"), auth=self._auth(host)) as response:
+                ussd_logs = [entry async for entry in _stream_ussd_entries(response)]
+
+            parsed = parse_ussd_logs(ussd_logs)
+            return {"raw": ussd_logs, "parsed": parsed}
+
+        raise ValueError(f"Unsupported action '{action_key}' for MikroTik driver")
 
     async def validate(self, host: Host) -> None:
         """Validate connectivity to the router.
@@ -109,8 +155,8 @@ class MikroTikRouterOSRestDriver(RouterDriver):
         A lightweight GET request is performed against the system resource
         endpoint. If this request fails an exception is raised.
         """
-        async with self._get_client(host) as client:
-            response = await client.get("/system/resource")
-            response.raise_for_status()
+        session = self._session_for(host)
+        async with session.get(self._url(host, "/system/resource"), auth=self._auth(host)) as response:
+            await response.read()
 
         logger.debug("Host %s validated successfully", host)
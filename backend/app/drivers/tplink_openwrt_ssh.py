@@ -1,28 +1,133 @@
 """TP-Link (OpenWrt) driver over SSH.
 
-- Health check: simple ping (online/offline).
-- Balance/data check: read USSD status from syslog (logread -e USSD).
+- Health check: simple ping (online/offline). The scheduler tick pings all
+  hosts at once with icmplib; single checks use an unprivileged ICMP socket.
+  Both fall back to the ping binary when ping sockets are not permitted.
+- Balance/data check: read USSD status from syslog (logread -l N -e USSD).
   We DO NOT execute USSD from MoniTe to avoid modem port conflicts.
+- SSH connections are kept open per (ip, port, user) and reused across
+  actions, so the handshake is paid once per router, not per command.
+- Concurrent USSD reads of the same host share one SSH round trip.
 """
 
 from __future__ import annotations
 
 import asyncio
+import itertools
+import logging
 import re
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import socket
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncssh
+from icmplib import ICMPLibError, async_multiping
 
 from .base import RouterDriver
 from ..models import Host
 
+logger = logging.getLogger(__name__)
+
 
 # Example log lines:
 # Sat Dec 27 07:00:30 2025 user.notice USSD: Recarga efectuafa: Tarifa: Activa. Datos: 7.53 GB validos 20 dias. Saldo: 319.23
-SYSLOG_DT_RE = re.compile(r"^(?P<wday>\w{3})\s+(?P<mon>\w{3})\s+(?P<day>\d{1,2})\s+(?P<time>\d{2}:\d{2}:\d{2})\s+(?P<year>\d{4})\s+(?P<rest>.*)$")
-USSD_PARSE_RE = re.compile(
-    r"Datos:\s*(?P<datos>[\d.]+)\s*(?P<unit>GB|MB)\s+validos\s+(?P<dias>\d+)\s+dias\.\s+Saldo:\s*(?P<saldo>[\d.]+)",
-    re.IGNORECASE,
-)
+_SYSLOG_DT = r"(?P<wday>\w{3})[ \t]+(?P<mon>\w{3})[ \t]+(?P<day>\d{1,2})[ \t]+(?P<time>\d{2}:\d{2}:\d{2})[ \t]+(?P<year>\d{4})[ \t]+"
+_USSD_FIELDS = r"Datos:\s*(?P<datos>[\d.]+)\s*(?P<unit>GB|MB)\s+validos\s+(?P<dias>\d+)\s+dias\.\s+Saldo:\s*(?P<saldo>[\d.]+)"
+
+SYSLOG_DT_RE = re.compile("^" + _SYSLOG_DT + r"(?P<rest>.*)$")
+USSD_PARSE_RE = re.compile(_USSD_FIELDS, re.IGNORECASE)
+# Fecha + campos USSD en una sola pasada; los campos son opcionales, así
+# una línea sin saldo sigue devolviendo fecha y mensaje.
+USSD_LINE_RE = re.compile("^" + _SYSLOG_DT + r"(?P<rest>.*?(?:" + _USSD_FIELDS + r".*)?)$", re.IGNORECASE)
+# Todas las líneas no vacías de un bloque de logread en un solo finditer; la
+# fecha es opcional para no perder líneas sin prefijo de syslog.
+SYSLOG_LINE_RE = re.compile(r"^[ \t]*(?:" + _SYSLOG_DT + r")?(?P<rest>\S.*)$", re.MULTILINE)
+
+# Meses de syslog -> número (evita strptime/datetime, lento y dependiente del locale).
+_MONTHS: Dict[str, int] = {
+    m: i
+    for i, m in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"),
+        start=1,
+    )
+}
+
+# Últimos mensajes de syslog que se leen por consulta (logread -l); el
+# filtro -e se aplica sobre esa ventana, no sobre todo el búfer. Si en la
+# ventana no hay bastantes líneas USSD se vuelve a leer el búfer entero.
+_LOGREAD_WINDOW = 200
+
+# Conexiones SSH abiertas, por (ip, port, user). Un lock por clave evita
+# que dos acciones simultáneas abran dos conexiones al mismo router.
+_ConnKey = Tuple[str, int, str]
+_conn_cache: Dict[_ConnKey, asyncssh.SSHClientConnection] = {}
+_conn_locks: Dict[_ConnKey, asyncio.Lock] = {}
+
+# Sin permiso para sockets ICMP (net.ipv4.ping_group_range) el batch se
+# desactiva y se vuelve al ping por host. None = aún no comprobado.
+_icmp_available: Optional[bool] = None
+
+
+def _icmp_socket_allowed() -> bool:
+    """True if this process may open unprivileged ICMP (ping) sockets."""
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP).close()
+    except OSError:
+        return False
+    return True
+
+
+# Pings por host simultáneos (validate manual o fallback del batch)
+_PING_SEMAPHORE = asyncio.Semaphore(16)
+_ping_seq = itertools.count(1)
+
+
+def _icmp_checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+async def _unprivileged_ping(ip: str, timeout: float = 1.0) -> None:
+    """Send one ICMP echo over a ping socket (no fork) and wait for the reply.
+
+    Raises PermissionError when ping sockets are not allowed for this
+    process, RuntimeError when no reply arrives within ``timeout``.
+    """
+    loop = asyncio.get_running_loop()
+    seq = next(_ping_seq) & 0xFFFF
+    payload = b"monite"
+    # El kernel pone el identificador del socket; el checksum se calcula igual
+    header = struct.pack("!BBHHH", 8, 0, 0, 0, seq)
+    packet = struct.pack("!BBHHH", 8, 0, _icmp_checksum(header + payload), 0, seq) + payload
+
+    try:
+        socket.inet_aton(ip)
+        addr = ip
+    except OSError:
+        # Nombre de host: resolver en el executor del loop
+        infos = await loop.getaddrinfo(ip, None, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+        addr = infos[0][4][0]
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP) as sock:
+        sock.setblocking(False)
+        sock.connect((addr, 0))  # datagrama: solo fija el destino, no bloquea
+        await loop.sock_sendall(sock, packet)
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise RuntimeError("Ping failed")
+            try:
+                reply = await asyncio.wait_for(loop.sock_recv(sock, 1024), remaining)
+            except asyncio.TimeoutError:
+                raise RuntimeError("Ping failed") from None
+            # Echo reply (type 0) con nuestro número de secuencia
+            if len(reply) >= 8 and reply[0] == 0 and struct.unpack("!H", reply[6:8])[0] == seq:
+                return
 
 
 class TPLinkOpenWrtSSHDriver(RouterDriver):
@@ -40,82 +145,171 @@ class TPLinkOpenWrtSSHDriver(RouterDriver):
 
     async def validate(self, host: Host) -> None:
         """Online/offline via ping (simple, no credentials)."""
-        # -c 1: one packet
-        # -W 1: timeout 1s (busybox ping uses -W seconds)
-        proc = await asyncio.create_subprocess_exec(
-            "ping",
-            "-c",
-            "1",
-            "-W",
-            "1",
-            host.ip,
-            stdout=asyncio.subprocess.DEVNULL,
-            stderr=asyncio.subprocess.DEVNULL,
-        )
-        rc = await proc.wait()
-        if rc != 0:
-            raise RuntimeError("Ping failed")
+        global _icmp_available
+        async with _PING_SEMAPHORE:
+            # El socket ICMP es solo IPv4; IPv6 sigue con el binario ping
+            if _icmp_available is not False and ":" not in host.ip:
+                try:
+                    await _unprivileged_ping(host.ip, timeout=1.0)
+                    return
+                except PermissionError:
+                    _icmp_available = False
+                    logger.warning("ICMP sockets not permitted; health checks fall back to ping per host")
+
+            # -c 1: one packet
+            # -W 1: timeout 1s (busybox ping uses -W seconds)
+            proc = await asyncio.create_subprocess_exec(
+                "ping",
+                "-c",
+                "1",
+                "-W",
+                "1",
+                host.ip,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            rc = await proc.wait()
+            if rc != 0:
+                raise RuntimeError("Ping failed")
+
+    async def validate_many(self, hosts: List[Host]) -> Optional[Dict[int, Optional[float]]]:
+        """Ping every host concurrently from a single in-process ICMP sender."""
+        global _icmp_available
+        if _icmp_available is None:
+            _icmp_available = _icmp_socket_allowed()
+            if not _icmp_available:
+                logger.warning("ICMP sockets not permitted; health checks fall back to ping per host")
+        if not _icmp_available or not hosts:
+            return None
+        try:
+            replies = await async_multiping(
+                [h.ip for h in hosts],
+                count=1,
+                timeout=1,
+                concurrent_tasks=256,
+                family=4,
+                privileged=False,
+            )
+        except (ICMPLibError, OSError) as exc:
+            logger.warning("Batch ICMP ping failed, falling back to ping per host: %s", exc)
+            return None
+        # async_multiping devuelve los resultados en el mismo orden que las IPs
+        return {h.id: (r.avg_rtt if r.is_alive else None) for h, r in zip(hosts, replies)}
+
+    # Lecturas que se comparten entre llamadas concurrentes (segundos de reuso)
+    _READ_TTL: Dict[str, float] = {
+        ACTION_CONSULTAR_SALDO: 30.0,
+        ACTION_VER_LOGS_USSD: 5.0,
+    }
 
     async def execute_action(self, host: Host, action_key: str, **kwargs: Any) -> Dict[str, Any]:
+        ttl = self._READ_TTL.get(action_key)
+        if ttl is None:
+            return await self._run_action(host, action_key, **kwargs)
+        return await self._coalesced(
+            host, action_key, ttl, lambda: self._run_action(host, action_key, **kwargs), kwargs
+        )
+
+    async def _run_action(self, host: Host, action_key: str, **kwargs: Any) -> Dict[str, Any]:
         if action_key == self.ACTION_CONSULTAR_SALDO:
-            # Read last USSD line from syslog
-            line = await self._ssh(host, "sh -c 'logread -e USSD | tail -n 1'")
+            # Read last USSD line from syslog (logread -l acota el búfer en el router)
+            line = await self._ssh(host, f"logread -l {_LOGREAD_WINDOW} -e USSD | tail -n 1")
+            if not line:
+                # Más de _LOGREAD_WINDOW mensajes desde el último USSD
+                line = await self._ssh(host, "logread -e USSD | tail -n 1")
             parsed = self._parse_ussd_line(line)
             return {"raw": line, "parsed": parsed}
 
         if action_key == self.ACTION_VER_LOGS_USSD:
             n = int(kwargs.get("lines", 20))
-            raw_text = await self._ssh(host, f"sh -c 'logread -e USSD | tail -n {n}'")
-            lines = [ln for ln in raw_text.splitlines() if ln.strip()]
-            items = [self._as_log_item(ln) for ln in lines]
+            window = max(n * 5, _LOGREAD_WINDOW)
+            raw_text = await self._ssh(host, f"logread -l {window} -e USSD | tail -n {n}")
+            if len(raw_text.splitlines()) < n:
+                # La ventana no tenía n líneas USSD: leer todo el búfer
+                raw_text = await self._ssh(host, f"logread -e USSD | tail -n {n}")
+            items = [self._match_to_item(m) for m in SYSLOG_LINE_RE.finditer(raw_text)]
             return {"raw": items, "parsed": {"count": len(items)}}
 
         raise ValueError(f"Action '{action_key}' not supported by TP-Link/OpenWrt driver")
 
+    async def aclose(self) -> None:
+        """Close every cached SSH connection."""
+        conns = list(_conn_cache.values())
+        _conn_cache.clear()
+        for conn in conns:
+            conn.close()
+        for conn in conns:
+            try:
+                await conn.wait_closed()
+            except Exception:
+                pass
+
     # -----------------------
     # Internals
     # -----------------------
 
-    async def _ssh(self, host: Host, remote_cmd: str) -> str:
-        """Run SSH command on router and return stdout."""
+    async def _get_conn(self, host: Host, *, fresh: bool = False) -> asyncssh.SSHClientConnection:
+        """Return the cached SSH connection for host, opening it if needed."""
         user = host.username or "root"
         port = int(host.port or 22)
+        key: _ConnKey = (host.ip, port, user)
 
-        proc = await asyncio.create_subprocess_exec(
-            "ssh",
-            "-o",
-            "BatchMode=yes",
-            "-o",
-            "StrictHostKeyChecking=no",
-            "-o",
-            "ConnectTimeout=5",
-            "-p",
-            str(port),
-            f"{user}@{host.ip}",
-            remote_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        out, err = await proc.communicate()
-        if proc.returncode != 0:
-            msg = (err or out).decode(errors="ignore").strip()
-            raise RuntimeError(msg or f"SSH failed with code {proc.returncode}")
-        return out.decode(errors="ignore").strip()
+        lock = _conn_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            conn = _conn_cache.get(key)
+            if conn is not None and (fresh or conn.is_closed()):
+                conn.close()
+                conn = None
+            if conn is None:
+                # Same semantics as the old `ssh -o BatchMode=yes
+                # -o StrictHostKeyChecking=no -o ConnectTimeout=5`:
+                # key/agent auth only, no host key verification.
+                conn = await asyncssh.connect(
+                    host.ip,
+                    port=port,
+                    username=user,
+                    known_hosts=None,
+                    password=None,
+                    kbdint_auth=False,
+                    connect_timeout=5,
+                    keepalive_interval=30,
+                )
+                _conn_cache[key] = conn
+            return conn
+
+    async def _ssh(self, host: Host, remote_cmd: str) -> str:
+        """Run SSH command on router and return stdout."""
+        conn = await self._get_conn(host)
+        try:
+            result = await conn.run(remote_cmd)
+        except (asyncssh.ConnectionLost, asyncssh.DisconnectError, BrokenPipeError):
+            # La conexión cacheada murió (router reiniciado, NAT, etc.): reconectar una vez
+            logger.debug("SSH connection to %s lost; reconnecting", host.ip)
+            conn = await self._get_conn(host, fresh=True)
+            result = await conn.run(remote_cmd)
+
+        out = str(result.stdout or "")
+        if result.exit_status != 0:
+            msg = (str(result.stderr or "") or out).strip()
+            raise RuntimeError(msg or f"SSH failed with code {result.exit_status}")
+        return out.strip()
 
     def _as_log_item(self, line: str) -> Dict[str, Any]:
         """Convert syslog line to {'time': 'YYYY-MM-DD HH:MM:SS', 'message': 'USSD: ...'}."""
         m = SYSLOG_DT_RE.match(line.strip())
         if not m:
             return {"time": None, "message": line.strip()}
+        return self._match_to_item(m)
 
-        dt_str = f"{m.group('wday')} {m.group('mon')} {m.group('day')} {m.group('time')} {m.group('year')}"
-        dt_iso = None
-        try:
-            # Example: "Sat Dec 27 07:00:30 2025"
-            dt = datetime.strptime(dt_str, "%a %b %d %H:%M:%S %Y")
-            dt_iso = dt.strftime("%Y-%m-%d %H:%M:%S")
-        except Exception:
-            dt_iso = None
+    def _match_to_item(self, m: re.Match) -> Dict[str, Any]:
+        """Build the log item from a syslog date match (``mon``/``day``/``time``/``year``/``rest``)."""
+        if m.group("mon") is None:
+            # Línea sin fecha (solo posible con SYSLOG_LINE_RE)
+            return {"time": None, "message": m.group("rest").strip()}
+
+        # Los grupos ya vienen validados por la regex: formatear sin crear un datetime
+        mon = _MONTHS.get(m.group("mon").capitalize())
+        dt_iso = f"{m.group('year')}-{mon:02d}-{int(m.group('day')):02d} {m.group('time')}" if mon else None
 
         rest = m.group("rest").strip()
         # We want message to start with "USSD:" if present
@@ -125,13 +319,20 @@ class TPLinkOpenWrtSSHDriver(RouterDriver):
 
     def _parse_ussd_line(self, line: str) -> Dict[str, Any]:
         """Parse saldo/datos/dias from the USSD syslog line."""
-        item = self._as_log_item(line)
-        msg = item.get("message") or ""
+        line = line.strip()
+        m = USSD_LINE_RE.match(line)
+        if m:
+            item = self._match_to_item(m)
+            fields = m if m.group("saldo") is not None else None
+        else:
+            # Línea sin fecha de syslog: buscamos los campos en el texto completo
+            item = {"time": None, "message": line}
+            fields = USSD_PARSE_RE.search(line)
 
-        m = USSD_PARSE_RE.search(msg)
-        if not m:
+        msg = item["message"]
+        if not fields:
             return {
-                "time": item.get("time"),
+                "time": item["time"],
                 "message": msg,
                 "saldo": None,
                 "datos_mb": None,
@@ -139,15 +340,15 @@ class TPLinkOpenWrtSSHDriver(RouterDriver):
                 "ok_parse": False,
             }
 
-        datos = float(m.group("datos"))
-        unit = m.group("unit").upper()
-        dias = int(m.group("dias"))
-        saldo = float(m.group("saldo"))
+        datos = float(fields.group("datos"))
+        unit = fields.group("unit").upper()
+        dias = int(fields.group("dias"))
+        saldo = float(fields.group("saldo"))
 
         datos_mb = datos * 1024 if unit == "GB" else datos
 
         return {
-            "time": item.get("time"),
+            "time": item["time"],
             "message": msg,
             "saldo": saldo,
             "datos_mb": datos_mb,
@@ -1,32 +1,33 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Tuple
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import Depends, FastAPI, Request
 
 from .database import init_db, engine
+from .drivers import close_drivers
 from .routers import hosts, actions, automation, history, config
 from .services.scheduler import SchedulerService
+from .services.telegram import close_alerts
 from .routers import settings as settings_router
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
-# Instantiate the scheduler service. It will be started on startup.
-scheduler_service = SchedulerService()
 
-# Make scheduler available to automation router
-automation.scheduler_service = scheduler_service
-
-
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Initialise resources when the app starts and release them when shutting down."""
+async def _bootstrap(app: FastAPI, scheduler_service: SchedulerService) -> None:
+    """Create tables and start the scheduler without delaying startup."""
     # Create database tables
-    await init_db()
+    try:
+        await init_db()
+    except Exception:
+        logger.exception("Database initialisation failed")
+        return
+    finally:
+        # Aun si falla: las peticiones deben fallar, no quedar esperando
+        app.state.db_ready.set()
 
     # Start scheduler (NO tumbar la app si falla)
     try:
@@ -36,15 +37,59 @@ async def lifespan(app: FastAPI):
     except Exception:
         logger.exception("Scheduler failed to start (continuing without scheduler)")
 
+
+async def wait_db_ready(request: Request) -> None:
+    """Hold DB-backed requests until the bootstrap has created the tables."""
+    ready = getattr(request.app.state, "db_ready", None)
+    if ready is not None and not ready.is_set():
+        await ready.wait()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialise resources when the app starts and release them when shutting down."""
+    # No-op si el servidor ya configuró el root logger (p. ej. --log-config)
+    logging.basicConfig(level=logging.INFO)
+
+    # El scheduler se crea aquí y no al importar: el import queda barato
+    # (uvicorn --reload, gunicorn --preload) y cada arranque tiene el suyo
+    scheduler_service = SchedulerService()
+    # Make scheduler available to automation router
+    automation.scheduler_service = scheduler_service
+
+    # init_db + scheduler en segundo plano: la app atiende desde el primer instante
+    app.state.db_ready = asyncio.Event()
+    # La sub-app /r no tiene lifespan propio: comparte el evento
+    read_app.state.db_ready = app.state.db_ready
+    app.state.init_task = asyncio.create_task(_bootstrap(app, scheduler_service))
+
     try:
         yield
     finally:
-        # Stop scheduler
+        init_task = app.state.init_task
+        if not init_task.done():
+            init_task.cancel()
         try:
-            await scheduler_service.stop()
-            logger.info("Scheduler stopped")
+            await init_task
+        except asyncio.CancelledError:
+            pass
         except Exception:
-            logger.exception("Scheduler failed to stop cleanly")
+            logger.exception("Startup bootstrap failed")
+
+        # Stop scheduler (solo si el bootstrap llegó a arrancarlo)
+        if scheduler_service.scheduler.running:
+            try:
+                await scheduler_service.stop()
+                logger.info("Scheduler stopped")
+            except Exception:
+                logger.exception("Scheduler failed to stop cleanly")
+        automation.scheduler_service = None
+
+        # Alertas de Telegram aún en cola
+        await close_alerts()
+
+        # Close cached router connections (HTTP clients / SSH)
+        await close_drivers()
 
         # ✅ IMPORTANT: Dispose DB engine to close pooled connections cleanly
         # This helps prevent noisy errors like:
@@ -58,27 +103,150 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(title="MoniTe Web API", lifespan=lifespan)
 
+class FastCORS:
+    """Pure-ASGI CORS for a fixed origin list, with credentials allowed.
+
+    Same behaviour as CORSMiddleware configured with ``allow_methods=["*"]``,
+    ``allow_headers=["*"]`` and ``allow_credentials=True``, but every
+    constant header is built once; requests without ``Origin`` pass
+    straight through. Preflights are answered here with a prebuilt,
+    bodiless 204 and never reach the routing layer.
+    """
+
+    _METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    _MAX_AGE = b"600"
+
+    def __init__(self, app, origins: Iterable[str]) -> None:
+        self.app = app
+        self._origins = frozenset(o.encode("latin-1") for o in origins)
+        self._preflight: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-methods", self._METHODS),
+            (b"access-control-max-age", self._MAX_AGE),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        # Respuesta 204 del preflight, completa por origen permitido
+        self._preflight_ok: Dict[bytes, List[Tuple[bytes, bytes]]] = {
+            origin: [(b"access-control-allow-origin", origin), *self._preflight]
+            for origin in self._origins
+        }
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        request_headers = b""
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight_response(origin, request_headers, send)
+            return
+
+        if origin not in self._origins:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cors(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                for i, (name, value) in enumerate(headers):
+                    if name.lower() == b"vary":
+                        headers[i] = (name, value + b", Origin")
+                        break
+                else:
+                    headers.append((b"vary", b"Origin"))
+                headers.append((b"access-control-allow-origin", origin))
+                headers.append((b"access-control-allow-credentials", b"true"))
+                # Cursor de paginación de los historiales
+                headers.append((b"access-control-expose-headers", b"X-Next-Cursor"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight_response(self, origin: bytes, request_headers: bytes, send) -> None:
+        allowed = self._preflight_ok.get(origin)
+        if allowed is not None:
+            status, body = 204, b""
+            headers = allowed
+            if request_headers:
+                # allow_headers=["*"] con credenciales: se devuelven los pedidos
+                headers = [*allowed, (b"access-control-allow-headers", request_headers)]
+        else:
+            body = b"Disallowed CORS origin"
+            status = 400
+            headers = [
+                *self._preflight,
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+class StripTrailingSlash:
+    """Route ``/hosts/`` and ``/hosts`` alike by dropping the trailing slash.
+
+    Collection routes are declared without it, so both spellings reach
+    the same handler without a 307 or a duplicate route.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] == "http" and len(path) > 1 and path.endswith("/"):
+            scope = {**scope, "path": path.rstrip("/") or "/"}
+            raw_path = scope.get("raw_path")
+            if raw_path:
+                scope["raw_path"] = raw_path.rstrip(b"/") or b"/"
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(StripTrailingSlash)
+
 # ✅ CORS for local dev + LAN access
 # Ajusta/añade tu IP si cambia
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
+    FastCORS,
+    origins=[
         "http://localhost:5173",
         "http://127.0.0.1:5173",
         "http://192.168.188.165:5173",
     ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
 )
 
-# Routers (sin prefijo /api)
-app.include_router(hosts.router)
-app.include_router(actions.router)
-app.include_router(automation.router)
-app.include_router(history.router)
-app.include_router(config.router)
-app.include_router(settings_router.router)
+# Routers (sin prefijo /api); todos usan la DB salvo "/"
+_db_deps = [Depends(wait_db_ready)]
+
+# Sub-app de sondeo montada en /r: solo los endpoints de lectura que el
+# dashboard consulta en bucle, sin middleware propio (el CORS lo pone la
+# app principal) ni el resto de la tabla de rutas. Montada la primera.
+read_app = FastAPI(title="MoniTe Web API (polling)", openapi_url=None)
+read_app.include_router(hosts.read_router, dependencies=_db_deps)
+read_app.include_router(history.read_router, dependencies=_db_deps)
+app.mount("/r", read_app)
+
+app.include_router(hosts.router, dependencies=_db_deps)
+app.include_router(actions.router, dependencies=_db_deps)
+app.include_router(automation.router, dependencies=_db_deps)
+app.include_router(history.router, dependencies=_db_deps)
+app.include_router(config.router, dependencies=_db_deps)
+app.include_router(settings_router.router, dependencies=_db_deps)
 
 # Root endpoint
 @app.get("/")
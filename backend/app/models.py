@@ -17,18 +17,44 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     JSON,
     Float,
 )
-from sqlalchemy.orm import relationship, synonym
-from sqlalchemy.orm import synonym
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import FunctionElement
 
 from .database import Base
 
 
+class _utcnow(FunctionElement):
+    """Server-side naive UTC timestamp, same values as ``datetime.utcnow``."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(_utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(_utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(_utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP en SQLite solo tiene segundos; %f conserva los ms
+    return "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
 class RouterType(str, enum.Enum):
     """Enumeration of supported router types.
 
@@ -78,6 +104,12 @@ class Host(Base):
     last_checked_at = Column(DateTime, nullable=True, index=True)
     last_latency_ms = Column(Float, nullable=True)
 
+    # Same idea for the most recent action run, kept up to date by
+    # ``execute_and_record`` so ``/hosts`` does not scan action_runs.
+    last_action_key = Column(String, nullable=True)
+    last_action_at = Column(DateTime, nullable=True)
+    last_action_status = Column(String, nullable=True)
+
     # Whether this host should send Telegram alerts on state change or
     # action failures. Defaults to True. Can be toggled via API.
     notify_enabled = Column(Boolean, nullable=False, default=True)
@@ -113,11 +145,23 @@ class ActionRun(Base):
     # Timestamp when the action began executing. Previously named
     # ``executed_at``. Kept for backwards compatibility – in new
     # records this represents the start time.
-    started_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, server_default=_utcnow(), index=True)
     # Backwards compatible alias for started_at. Many legacy parts of the
-    # code refer to ``executed_at``. We map it via a SQLAlchemy
-    # synonym so that both attribute names point to the same column.
-    executed_at = synonym("started_at")
+    # code refer to ``executed_at``. A hybrid property keeps it usable
+    # in queries (``ActionRun.executed_at == x``) while instance reads
+    # are a plain attribute lookup instead of going through a synonym.
+    @hybrid_property
+    def executed_at(self) -> Optional[datetime]:
+        return self.started_at
+
+    @executed_at.inplace.setter
+    def _executed_at_setter(self, value: Optional[datetime]) -> None:
+        self.started_at = value
+
+    @executed_at.inplace.expression
+    @classmethod
+    def _executed_at_expression(cls):
+        return cls.started_at
 
     # Timestamp when the action finished. Nullable until completion.
     finished_at = Column(DateTime, nullable=True)
@@ -148,6 +192,12 @@ class ActionRun(Base):
 
     host = relationship("Host", back_populates="runs")
 
+    __table_args__ = (
+        # Última ejecución por host (list_hosts, historial por host); id DESC
+        # cubre el desempate de list_hosts sin ordenar en memoria
+        Index("ix_action_runs_host_started_id", host_id, started_at.desc(), id.desc()),
+    )
+
     def __repr__(self) -> str:  # pragma: no cover
         return f"<ActionRun id={self.id} host_id={self.host_id} action={self.action_key}>"
 
@@ -195,15 +245,20 @@ class HostHealth(Base):
     __tablename__ = "host_health"
 
     id = Column(Integer, primary_key=True, index=True)
-    host_id = Column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), nullable=False, index=True)
+    host_id = Column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), nullable=False)
     status = Column(String, nullable=False, index=True)  # e.g. "online" or "offline"
     latency_ms = Column(Float, nullable=True)
     error_message = Column(Text, nullable=True)
-    checked_at = Column(DateTime, default=datetime.utcnow, index=True)
+    checked_at = Column(DateTime, server_default=_utcnow(), index=True)
 
     # Relationship back to Host
     host = relationship("Host", back_populates="health_checks")
 
+    __table_args__ = (
+        # Último chequeo / historial por host; cubre también filtros por host_id
+        Index("ix_host_health_host_checked", host_id, checked_at.desc()),
+    )
+
     def __repr__(self) -> str:  # pragma: no cover
         return f"<HostHealth id={self.id} host_id={self.host_id} status={self.status} at={self.checked_at}>"
 
@@ -0,0 +1,34 @@
+"""Conditional GET helpers for read-mostly endpoints.
+
+Bodies are serialised once and kept with their ETag; requests whose
+``If-None-Match`` matches get an empty 304 instead of the JSON.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Tuple
+
+from fastapi import Request, Response
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag (quoted) for an already serialised body."""
+    return '"%s"' % hashlib.md5(body, usedforsecurity=False).hexdigest()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Lista separada por comas; W/ se ignora (comparación débil, RFC 9110)
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_json_response(request: Request, cached: Tuple[bytes, str], max_age: int = 60) -> Response:
+    """Return ``cached`` (body, etag) as JSON, or 304 when the client has it."""
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": f"max-age={max_age}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,42 @@
+"""Keyset cursors for the newest-first history endpoints.
+
+A cursor is ``"<timestamp>,<id>"`` taken from the last row of a full
+page; rows sharing that timestamp are told apart by id, so none is
+skipped between pages. A bare timestamp (older clients) still works and
+returns everything strictly older than it.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+Cursor = Tuple[datetime, Optional[int]]
+
+
+def parse_cursor(before: Optional[str]) -> Optional[Cursor]:
+    """Parse the ``before`` query value; 422 when it is malformed."""
+    if not before:
+        return None
+    ts, _, row_id = before.partition(",")
+    try:
+        return datetime.fromisoformat(ts.strip()), int(row_id) if row_id else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid 'before' cursor") from None
+
+
+def older_than(ts_column, id_column, cursor: Cursor) -> ColumnElement[bool]:
+    """WHERE clause for rows after ``cursor`` in (ts DESC, id DESC) order."""
+    ts, row_id = cursor
+    if row_id is None:
+        return ts_column < ts
+    return tuple_(ts_column, id_column) < tuple_(ts, row_id)
+
+
+def make_cursor(ts: datetime, row_id: int) -> str:
+    """Cursor value for the ``X-Next-Cursor`` header."""
+    return f"{ts.isoformat()},{row_id}"
@@ -5,6 +5,8 @@ from __future__ import annotations
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_async_session
@@ -15,12 +17,35 @@ from ..services.action_runner import execute_and_record
 router = APIRouter(prefix="/hosts", tags=["actions"])
 
 
+async def _load_host_ref(session: AsyncSession, host_id: int) -> Row:
+    """Load only the host columns drivers and alerts read, or raise 404.
+
+    The returned row exposes them as attributes (``ref.ip``, ``ref.port``...),
+    so it can stand in for a ``Host`` without hydrating an ORM instance.
+    """
+    ref = (
+        await session.execute(
+            select(
+                Host.id,
+                Host.name,
+                Host.ip,
+                Host.port,
+                Host.username,
+                Host.password,
+                Host.router_type,
+                Host.notify_enabled,
+            ).where(Host.id == host_id)
+        )
+    ).first()
+    if ref is None:
+        raise HTTPException(status_code=404, detail="Host not found")
+    return ref
+
+
 @router.post("/{host_id}/actions/{action_key}", response_model=ActionRunResponse)
 async def run_action(host_id: int, action_key: str, session: AsyncSession = Depends(get_async_session)) -> Any:
     """Execute an action on a given host and record the result."""
-    host = await session.get(Host, host_id)
-    if not host:
-        raise HTTPException(status_code=404, detail="Host not found")
+    host = await _load_host_ref(session, host_id)
     # Execute action with Telegram alerts enabled so failures trigger notifications
     run = await execute_and_record(session, host, action_key, attempt=1, max_attempts=1, telegram_enabled=True)
     return run
@@ -42,9 +67,7 @@ async def execute_action(
     ``params`` dictionary.  It forwards the call to the driver via
     ``execute_and_record``, capturing the result in the action history.
     """
-    host = await session.get(Host, host_id)
-    if not host:
-        raise HTTPException(status_code=404, detail="Host not found")
+    host = await _load_host_ref(session, host_id)
     action_key = payload.action_key
     params = payload.params or {}
     run = await execute_and_record(
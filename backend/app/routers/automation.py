@@ -4,8 +4,9 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_async_session
@@ -26,36 +27,66 @@ router = APIRouter(prefix="/automation-rules", tags=["automation"])
 scheduler_service: SchedulerService | None = None
 
 
-@router.get("/", response_model=List[AutomationRuleResponse])
-async def list_rules(session: AsyncSession = Depends(get_async_session)) -> List[AutomationRule]:
-    result = await session.execute(select(AutomationRule))
-    rules = result.scalars().all()
-    return rules
+@router.get("", response_model=List[AutomationRuleResponse])
+async def list_rules(session: AsyncSession = Depends(get_async_session)) -> Response:
+    # Filas de la DB ya válidas: columnas de AutomationRuleResponse directo a
+    # orjson, sin objetos ORM ni validación Pydantic por regla.
+    result = await session.execute(
+        select(
+            AutomationRule.host_id,
+            AutomationRule.action_key,
+            AutomationRule.schedule,
+            AutomationRule.enabled,
+            AutomationRule.timeout_seconds,
+            AutomationRule.retry_enabled,
+            AutomationRule.retry_delay_minutes,
+            AutomationRule.max_attempts,
+            AutomationRule.telegram_enabled,
+            AutomationRule.id,
+        )
+    )
+    return Response(content=orjson.dumps([dict(row) for row in result.mappings()]), media_type="application/json")
 
 
-@router.post("/", response_model=AutomationRuleResponse, status_code=status.HTTP_201_CREATED)
-async def create_rule(payload: AutomationRuleCreate, session: AsyncSession = Depends(get_async_session)) -> AutomationRule:
-    rule = AutomationRule(**payload.model_dump())
-    session.add(rule)
+@router.post("", response_model=AutomationRuleResponse, status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    payload: AutomationRuleCreate,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_session),
+) -> AutomationRule:
+    result = await session.execute(insert(AutomationRule).values(**payload.model_dump()).returning(AutomationRule))
+    rule = result.scalar_one()
     await session.commit()
-    await session.refresh(rule)
-    # schedule job if scheduler is available
+    # schedule job if scheduler is available; runs after the 201 is sent
     if scheduler_service:
-        await scheduler_service.add_job(rule.id)
+        background_tasks.add_task(scheduler_service.add_job, rule.id)
     return rule
 
 
 @router.put("/{rule_id}", response_model=AutomationRuleResponse)
-async def update_rule(rule_id: int, payload: AutomationRuleUpdate, session: AsyncSession = Depends(get_async_session)) -> AutomationRule:
-    rule = await session.get(AutomationRule, rule_id)
+async def update_rule(
+    rule_id: int,
+    payload: AutomationRuleUpdate,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_session),
+) -> AutomationRule:
+    changes = payload.model_dump(exclude_unset=True)
+    if changes:
+        # UPDATE ... RETURNING: existencia, cambio y fila nueva en un solo viaje
+        result = await session.execute(
+            update(AutomationRule)
+            .where(AutomationRule.id == rule_id)
+            .values(**changes)
+            .returning(AutomationRule)
+        )
+        rule = result.scalar_one_or_none()
+    else:
+        rule = await session.get(AutomationRule, rule_id)
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
-    for field, value in payload.model_dump(exclude_unset=True).items():
-        setattr(rule, field, value)
     await session.commit()
-    await session.refresh(rule)
     if scheduler_service:
-        await scheduler_service.add_job(rule.id)
+        background_tasks.add_task(scheduler_service.add_job, rule.id)
     return rule
 
 
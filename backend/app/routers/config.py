@@ -2,24 +2,50 @@
 
 This router exposes a minimal configuration payload that is safe for the
 frontend to consume.  Only human‑readable values are returned; secrets
-such as database credentials or API tokens are never included.  The
-existing backend configuration (``backend/settings.py``) defined a
-similar endpoint.  To unify the project under ``backend/app`` we
-reimplement that behaviour here using the new settings model.
+such as database credentials or API tokens are never included.  Values
+come from the single settings model in ``backend/app/config.py``.
 """
 
 from __future__ import annotations
 
-from fastapi import APIRouter
+from typing import Optional, Tuple
 
-from ..config import settings
+import orjson
+from fastapi import APIRouter, Request, Response
 
+from ..config import Settings, get_settings
+from ._http_cache import cached_json_response, make_etag
 
-router = APIRouter(prefix="/config", tags=["config"])
 
+router = APIRouter(prefix="/config", tags=["config"])
 
-@router.get("/", response_model=dict)
-async def get_config() -> dict[str, object]:
+# Cuerpo JSON ya serializado y su ETag, rehechos solo si cambia el objeto
+# Settings (get_settings() está cacheado: en la práctica una vez por proceso).
+_cached_body: Tuple[Optional[Settings], Tuple[bytes, str]] = (None, (b"", ""))
+
+
+def _config_body() -> Tuple[bytes, str]:
+    global _cached_body
+    settings = get_settings()
+    if _cached_body[0] is not settings:
+        payload = {
+            # Use the scheduler timezone from the new settings.  Defaults to UTC.
+            "scheduler_timezone": settings.scheduler_timezone,
+            # Preserve the legacy behaviour of returning a request timeout
+            # value.  The ``backend/app`` settings do not define
+            # ``request_timeout``, so we hardcode a sensible default (10 seconds).
+            "request_timeout": 10.0,
+            # Expose whether Telegram is configured by checking that both
+            # token and chat ID are present.  Booleans are safe to expose.
+            "telegram_configured": bool(settings.telegram_token and settings.telegram_chat_id),
+        }
+        body = orjson.dumps(payload)
+        _cached_body = (settings, (body, make_etag(body)))
+    return _cached_body[1]
+
+
+@router.get("", response_model=dict)
+async def get_config(request: Request) -> Response:
     """Return global settings relevant for the frontend.
 
     The response includes only non‑sensitive configuration values.  The
@@ -27,15 +53,8 @@ async def get_config() -> dict[str, object]:
     notifications are configured are provided.  If additional values are
     required by the frontend in the future they should be added here
     explicitly to avoid leaking secrets.
+
+    Sent with an ETag and ``Cache-Control: max-age=60``; a matching
+    ``If-None-Match`` gets a 304.
     """
-    return {
-        # Use the scheduler timezone from the new settings.  Defaults to UTC.
-        "scheduler_timezone": settings.scheduler_timezone,
-        # Preserve the legacy behaviour of returning a request timeout
-        # value.  The ``backend/app`` settings do not define
-        # ``request_timeout``, so we hardcode a sensible default (10 seconds).
-        "request_timeout": 10.0,
-        # Expose whether Telegram is configured by checking that both
-        # token and chat ID are present.  Booleans are safe to expose.
-        "telegram_configured": bool(settings.telegram_token and settings.telegram_chat_id),
-    }
+    return cached_json_response(request, _config_body())
@@ -2,16 +2,18 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Mapping, Optional, Sequence
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
+import orjson
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import Text, select, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_async_session
 from ..models import ActionRun
 from ..schemas import ActionRunResponse
+from ..services.run_output import resolve_outputs
+from ._pagination import make_cursor, older_than, parse_cursor
 
 # Use the canonical prefix "/action-runs" for history endpoints.  The
 # previous implementation used "/runs" which conflicted with the new
@@ -23,23 +25,105 @@ from ..schemas import ActionRunResponse
 router = APIRouter(prefix="/action-runs", tags=["history"])
 
 
-@router.get("/", response_model=List[ActionRunResponse])
+# Columnas de ActionRunResponse, leídas como tuplas (sin objetos ORM).
+RUN_SUMMARY_COLUMNS = (
+    ActionRun.id,
+    ActionRun.host_id,
+    ActionRun.router_type,
+    ActionRun.action_key,
+    ActionRun.started_at,
+    ActionRun.finished_at,
+    ActionRun.duration_ms,
+    ActionRun.status,
+    ActionRun.error_message,
+)
+# Salidas (TEXT/JSON grandes). response_parsed se lee como el texto JSON
+# guardado: dump_runs lo inserta tal cual, sin json.loads + re-serializar.
+RUN_OUTPUT_COLUMNS = (
+    ActionRun.stdout,
+    ActionRun.stderr,
+    type_coerce(ActionRun.response_parsed, Text).label("response_parsed"),
+    ActionRun.response_raw,
+)
+
+
+def dump_runs(rows: Sequence[Mapping[str, Any]]) -> bytes:
+    """Serialise run rows straight to ActionRunResponse-shaped JSON.
+
+    Output columns missing from ``rows`` are emitted as ``null``; file
+    references must already be resolved (``resolve_outputs``).
+    """
+    items = []
+    for row in rows:
+        parsed = row.get("response_parsed")
+        items.append(
+            {
+                "id": row["id"],
+                "host_id": row["host_id"],
+                "router_type": row["router_type"],
+                "action_key": row["action_key"],
+                "started_at": row["started_at"],
+                "executed_at": row["started_at"],
+                "finished_at": row["finished_at"],
+                "duration_ms": row["duration_ms"],
+                "status": row["status"],
+                "stdout": row.get("stdout"),
+                "stderr": row.get("stderr"),
+                "response_parsed": orjson.Fragment(parsed) if parsed is not None else None,
+                "response_raw": row.get("response_raw"),
+                "error_message": row["error_message"],
+            }
+        )
+    return orjson.dumps(items)
+
+
+# Tamaño de página si se pagina con before sin indicar limit
+_DEFAULT_PAGE = 100
+
+
+@router.get("", response_model=List[ActionRunResponse])
 async def list_runs(
     host_id: Optional[int] = Query(None),
     action_key: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (100 when paging with before)"),
+    before: Optional[str] = Query(None, description="Keyset cursor ('started_at,id') from X-Next-Cursor"),
     session: AsyncSession = Depends(get_async_session),
-) -> List[ActionRun]:
-    """List action runs with optional filters."""
-    query = select(ActionRun)
+) -> Response:
+    """List action runs with optional filters, newest first.
+
+    Without ``limit`` or ``before`` every matching run is returned, as
+    before pagination existed. Otherwise results are paged by
+    ``(started_at, id)``: when a page is full the ``X-Next-Cursor``
+    header holds the ``before`` value for the next one.
+    The body is built by ``dump_runs``; ``response_model`` only documents it.
+    """
+    cursor = parse_cursor(before)
+    if limit is None and cursor is not None:
+        limit = _DEFAULT_PAGE
+    query = select(*RUN_SUMMARY_COLUMNS, *RUN_OUTPUT_COLUMNS)
     if host_id is not None:
         query = query.where(ActionRun.host_id == host_id)
     if action_key is not None:
         query = query.where(ActionRun.action_key == action_key)
     if status is not None:
         query = query.where(ActionRun.status == status)
+    if cursor is not None:
+        query = query.where(older_than(ActionRun.started_at, ActionRun.id, cursor))
     # Most recent first
-    query = query.order_by(ActionRun.started_at.desc())
+    query = query.order_by(ActionRun.started_at.desc(), ActionRun.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
     result = await session.execute(query)
-    runs = result.scalars().all()
-    return runs
+    runs = await resolve_outputs(result.mappings().all())
+    headers = {}
+    if limit is not None and len(runs) == limit:
+        headers["X-Next-Cursor"] = make_cursor(runs[-1]["started_at"], runs[-1]["id"])
+    return Response(content=dump_runs(runs), media_type="application/json", headers=headers)
+
+
+# Variante de sondeo para la sub-app /r (ver hosts.read_router)
+read_router = APIRouter(prefix="/action-runs", tags=["history"])
+
+
+read_router.add_api_route("", list_runs, response_model=List[ActionRunResponse], include_in_schema=False)
@@ -2,17 +2,24 @@
 
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, func
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Text, case, delete, func, insert, or_, select, type_coerce, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_async_session
-from ..models import Host, HostHealth, ActionRun
-from ..drivers import get_driver
+from ..models import Host, HostHealth, ActionRun, AutomationRule
+from ..drivers import forget_host, get_driver
 from ..schemas import HostCreate, HostResponse, HostUpdate
-from ..schemas import HostHealthResponse, ActionRunResponse
+from ..schemas import HostHealthResponse, HostHealthSummary, ActionRunResponse
+from ..services.run_output import STORED_REF_PREFIXES, output_files, remove_output_files, resolve_outputs
+from ._http_cache import cached_json_response, make_etag
+from ._pagination import make_cursor, older_than, parse_cursor
+from .history import RUN_OUTPUT_COLUMNS, RUN_SUMMARY_COLUMNS, dump_runs
 
 
 router = APIRouter(prefix="/hosts", tags=["hosts"])
@@ -22,131 +29,153 @@ router = APIRouter(prefix="/hosts", tags=["hosts"])
 # Helpers
 # ----------------------------
 
-_TPLINK_KEYS = {"TPLINK", "TP-LINK", "OPENWRT", "TP_LINK_OPENWRT_SSH", "TP-LINK_OPENWRT_SSH"}
-_MIKROTIK_KEYS = {"MIKROTIK", "MIKROTIK_REST", "MIKROTIK_ROUTEROS", "MIKROTIK_ROUTEROS_REST"}
+# Alias normalizado -> (router_type canónico, puerto por defecto o None)
+_ROUTER_TYPE_ALIASES: Dict[str, Tuple[str, Optional[int]]] = {
+    # TP-Link/OpenWrt uses SSH: 22
+    **{k: ("TP_LINK_OPENWRT_SSH", 22) for k in ("TPLINK", "TP-LINK", "OPENWRT", "TP_LINK_OPENWRT_SSH", "TP-LINK_OPENWRT_SSH")},
+    # Mikrotik REST: el puerto se deja como venga
+    **{k: ("MIKROTIK_ROUTEROS_REST", None) for k in ("MIKROTIK", "MIKROTIK_REST", "MIKROTIK_ROUTEROS", "MIKROTIK_ROUTEROS_REST")},
+}
 
 
 def _normalize_router_type_and_port(data: dict) -> dict:
     """Normalize router_type (aliases -> canonical) and default ports."""
-    rt = str(data.get("router_type") or "").strip().upper()
-
-    if rt in _TPLINK_KEYS:
-        data["router_type"] = "TP_LINK_OPENWRT_SSH"
-        # TP-Link/OpenWrt uses SSH: 22
-        if not data.get("port") or data.get("port") == 80:
-            data["port"] = 22
-
-    elif rt in _MIKROTIK_KEYS:
-        data["router_type"] = "MIKROTIK_ROUTEROS_REST"
-        # Mikrotik REST (si quieres forzarlo, déjalo; si no, no lo toques)
-        # if not data.get("port"):
-        #     data["port"] = 80
-
+    match = _ROUTER_TYPE_ALIASES.get((data.get("router_type") or "").strip().upper())
+    if match:
+        canonical, default_port = match
+        data["router_type"] = canonical
+        if default_port and (not data.get("port") or data.get("port") == 80):
+            data["port"] = default_port
     return data
 
 
-# ----------------------------
-# Hosts list
-# ----------------------------
+# Resúmenes que el dashboard sondea: cuerpo JSON cacheado unos segundos,
+# invalidado (por versión) cuando la API modifica hosts. Los chequeos de
+# salud no invalidan: el TTL acota cuánto tarda en verse su resultado.
+_SUMMARY_TTL = 3.0
+_summary_cache: Dict[str, Tuple[int, float, bytes]] = {}
+_summary_lock = asyncio.Lock()
+_summary_version = 0
 
-@router.get("/", response_model=List[HostResponse])
-async def list_hosts(session: AsyncSession = Depends(get_async_session)) -> List[dict]:
-    """List hosts including a lightweight 'last action' summary."""
 
-    last_run_sq = (
-        select(ActionRun.host_id, func.max(ActionRun.started_at).label("max_started_at"))
-        .group_by(ActionRun.host_id)
-        .subquery()
-    )
+def _invalidate_summaries() -> None:
+    global _summary_version
+    _summary_version += 1
 
-    q = (
-        select(
-            Host,
-            ActionRun.action_key,
-            ActionRun.started_at,
-            ActionRun.status,
-        )
-        .outerjoin(last_run_sq, Host.id == last_run_sq.c.host_id)
-        .outerjoin(
-            ActionRun,
-            (ActionRun.host_id == Host.id) & (ActionRun.started_at == last_run_sq.c.max_started_at),
-        )
-        .order_by(Host.id.asc())
-    )
 
-    result = await session.execute(q)
-    rows = result.all()
+async def _cached_summary(key: str, build: Callable[[], Awaitable[Any]]) -> Response:
+    async with _summary_lock:
+        # Bajo el lock: N clientes a la vez hacen una sola consulta
+        entry = _summary_cache.get(key)
+        if entry is None or entry[0] != _summary_version or time.monotonic() - entry[1] >= _SUMMARY_TTL:
+            version = _summary_version
+            body = orjson.dumps(await build())
+            entry = _summary_cache[key] = (version, time.monotonic(), body)
+    return Response(content=entry[2], media_type="application/json")
 
-    payload: list[dict] = []
-    for host, last_action_key, last_action_at, last_action_status in rows:
-        d = HostResponse.model_validate(host).model_dump()
 
-        # cache de health del Host
-        d["last_latency_ms"] = host.last_latency_ms
-        d["last_check_at"] = host.last_checked_at
-        # IMPORTANTE: en tu sistema guardas "online"/"offline" (minúsculas)
-        d["last_online"] = (host.last_status == "online") if host.last_status else None
+# ----------------------------
+# Hosts list
+# ----------------------------
 
-        # last action derivado
-        d["last_action_key"] = last_action_key
-        d["last_action_at"] = last_action_at
-        d["last_action_status"] = last_action_status
-        payload.append(d)
+def _host_to_dict(host: Any) -> Dict[str, Any]:
+    """HostResponse-shaped dict (by alias, no password) from a Host or row.
+
+    Los datos vienen de la DB ya válidos: se arma el dict a mano y se
+    serializa con orjson, sin validar con Pydantic host por host.
+    """
+    return {
+        "id": host.id,
+        "name": host.name,
+        "ip": host.ip,
+        "username": host.username,
+        "port": host.port,
+        "enabled": host.enabled,
+        "notify_enabled": host.notify_enabled,
+        "router_type": host.router_type,
+        "last_status": host.last_status,
+        "last_checked_at": host.last_checked_at,
+        "last_latency_ms": host.last_latency_ms,
+        # IMPORTANTE: en tu sistema guardas "online"/"offline" (minúsculas)
+        "last_online": (host.last_status == "online") if host.last_status else None,
+        "last_check_at": host.last_checked_at,
+        # last action (columnas de resumen en hosts)
+        "last_action_key": host.last_action_key,
+        "last_action_at": host.last_action_at,
+        "last_action_status": host.last_action_status,
+    }
 
-    return payload
 
+def _host_response(host: Host, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(content=orjson.dumps(_host_to_dict(host)), media_type="application/json", status_code=status_code)
 
-# -----------------------------------------------------------------------------
-# Trailing slash aliases
-# -----------------------------------------------------------------------------
 
+# ``/hosts/`` llega como ``/hosts`` (StripTrailingSlash en main.py)
 @router.get("", response_model=List[HostResponse])
-async def list_hosts_alias(session: AsyncSession = Depends(get_async_session)) -> List[Host]:
-    """Alias for ``/hosts/`` to avoid 307 redirects on ``/hosts``."""
-    return await list_hosts(session)
+async def list_hosts(session: AsyncSession = Depends(get_async_session)) -> Response:
+    """List hosts including a lightweight 'last action' summary."""
 
+    # last_action_* se guardan en hosts (execute_and_record): sin join
+    q = select(
+        Host.id,
+        Host.name,
+        Host.ip,
+        Host.username,
+        Host.port,
+        Host.enabled,
+        Host.notify_enabled,
+        Host.router_type,
+        Host.last_status,
+        Host.last_checked_at,
+        Host.last_latency_ms,
+        Host.last_action_key,
+        Host.last_action_at,
+        Host.last_action_status,
+    ).order_by(Host.id.asc())
 
-@router.post("", response_model=HostResponse, status_code=status.HTTP_201_CREATED)
-async def create_host_alias(payload: HostCreate, session: AsyncSession = Depends(get_async_session)) -> Host:
-    """Alias for ``/hosts/`` POST to avoid 307 redirects on ``/hosts``."""
-    return await create_host(payload, session)
+    result = await session.execute(q)
+
+    payload = [_host_to_dict(host) for host in result]
+    return Response(content=orjson.dumps(payload), media_type="application/json")
 
 
 # ----------------------------
 # CRUD
 # ----------------------------
 
-@router.post("/", response_model=HostResponse, status_code=status.HTTP_201_CREATED)
-async def create_host(payload: HostCreate, session: AsyncSession = Depends(get_async_session)) -> Host:
+@router.post("", response_model=HostResponse, status_code=status.HTTP_201_CREATED)
+async def create_host(payload: HostCreate, session: AsyncSession = Depends(get_async_session)) -> Response:
     data = payload.model_dump()
     data = _normalize_router_type_and_port(data)
 
-    host = Host(**data)
-    session.add(host)
+    # INSERT ... RETURNING: la fila (id y defaults incluidos) en un solo viaje
+    result = await session.execute(insert(Host).values(**data).returning(Host))
+    host = result.scalar_one()
     await session.commit()
-    await session.refresh(host)
-    return host
+    _invalidate_summaries()
+    return _host_response(host, status.HTTP_201_CREATED)
 
 
 @router.get("/{host_id}", response_model=HostResponse)
-async def get_host(host_id: int, session: AsyncSession = Depends(get_async_session)) -> Host:
+async def get_host(host_id: int, session: AsyncSession = Depends(get_async_session)) -> Response:
     host = await session.get(Host, host_id)
     if not host:
         raise HTTPException(status_code=404, detail="Host not found")
-    return host
+    return _host_response(host)
 
 
 @router.put("/{host_id}", response_model=HostResponse)
-async def update_host(host_id: int, payload: HostUpdate, session: AsyncSession = Depends(get_async_session)) -> Host:
-    host = await session.get(Host, host_id)
-    if not host:
-        raise HTTPException(status_code=404, detail="Host not found")
-
+async def update_host(host_id: int, payload: HostUpdate, session: AsyncSession = Depends(get_async_session)) -> Response:
     updates = payload.model_dump(exclude_unset=True)
 
-    # aplicar updates
-    for field, value in updates.items():
-        setattr(host, field, value)
+    if updates:
+        # UPDATE ... RETURNING: aplica los cambios y devuelve la fila en un viaje
+        result = await session.execute(update(Host).where(Host.id == host_id).values(**updates).returning(Host))
+        host = result.scalar_one_or_none()
+    else:
+        host = await session.get(Host, host_id)
+    if not host:
+        raise HTTPException(status_code=404, detail="Host not found")
 
     # si cambió router_type o port, normalizamos
     if "router_type" in updates or "port" in updates:
@@ -159,73 +188,123 @@ async def update_host(host_id: int, payload: HostUpdate, session: AsyncSession =
         host.router_type = normalized["router_type"]
         host.port = normalized.get("port", host.port)
 
+    # expire_on_commit=False: la instancia sigue cargada, sin refresh
     await session.commit()
-    await session.refresh(host)
-    return host
+    _invalidate_summaries()
+    # IP / credenciales nuevas: no reutilizar lecturas del router anterior
+    forget_host(host_id)
+    return _host_response(host)
 
 
 @router.delete("/{host_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_host(host_id: int, session: AsyncSession = Depends(get_async_session)) -> None:
-    host = await session.get(Host, host_id)
-    if not host:
+    result = await session.execute(delete(Host).where(Host.id == host_id))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Host not found")
-    await session.delete(host)
+    # Salidas volcadas a disco de sus ejecuciones (se borran tras el commit)
+    parsed_text = type_coerce(ActionRun.response_parsed, Text)
+    spilled = await session.execute(
+        select(ActionRun.stdout, parsed_text.label("response_parsed")).where(
+            ActionRun.host_id == host_id,
+            or_(
+                ActionRun.stdout.startswith(STORED_REF_PREFIXES["stdout"], autoescape=True),
+                parsed_text.startswith(STORED_REF_PREFIXES["response_parsed"], autoescape=True),
+            ),
+        )
+    )
+    files = output_files(spilled.mappings().all())
+    # SQLite sin foreign_keys no aplica ON DELETE CASCADE: hijos en bloque,
+    # en la misma transacción (sin cargarlos uno a uno como el cascade ORM)
+    for child in (ActionRun, HostHealth, AutomationRule):
+        await session.execute(delete(child).where(child.host_id == host_id))
     await session.commit()
+    _invalidate_summaries()
+    forget_host(host_id)
+    await remove_output_files(files)
 
 
 # ----------------------------
 # Actions available per host (driver-based)
 # ----------------------------
 
+# Las acciones de un driver son estáticas: (cuerpo JSON, ETag) por router_type
+_ACTIONS_BODIES: Dict[str, Tuple[bytes, str]] = {}
+
+
 @router.get("/{host_id}/actions", response_model=List[str])
-async def list_host_actions(host_id: int, session: AsyncSession = Depends(get_async_session)) -> List[str]:
-    host = await session.get(Host, host_id)
-    if not host:
+async def list_host_actions(
+    host_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    router_type = (
+        await session.execute(select(Host.router_type).where(Host.id == host_id))
+    ).scalar_one_or_none()
+    if router_type is None:
         raise HTTPException(status_code=404, detail="Host not found")
-    driver = get_driver(host.router_type)
-    return driver.list_supported_actions()
+    cached = _ACTIONS_BODIES.get(router_type)
+    if cached is None:
+        body = orjson.dumps(get_driver(router_type).list_supported_actions())
+        cached = _ACTIONS_BODIES[router_type] = (body, make_etag(body))
+    return cached_json_response(request, cached)
 
 
 # -----------------------------------------------------------------------------
 # Health and history endpoints
 # -----------------------------------------------------------------------------
 
-@router.get("/summary/health")
-async def health_list(session: AsyncSession = Depends(get_async_session)) -> list[dict[str, object]]:
-    """Return per-host health information."""
-    result = await session.execute(select(Host))
-    hosts = result.scalars().all()
+@router.get("/summary/health", response_model=List[HostHealthSummary])
+async def health_list(session: AsyncSession = Depends(get_async_session)) -> Response:
+    """Return per-host health information (cached for ``_SUMMARY_TTL`` seconds)."""
 
-    health_data: list[dict[str, object]] = []
-    for host in hosts:
-        if host.last_status is None:
-            online = None
-        else:
-            online = host.last_status == "online"
-
-        health_data.append(
+    async def build() -> list[dict[str, object]]:
+        # Solo las columnas del resumen: tuplas, sin objetos Host en la sesión.
+        # "online" lo calcula la DB: NULL = 'online' -> NULL, así que sin
+        # estado sale None y si no True/False.
+        result = await session.execute(
+            select(Host.id, Host.last_status == "online", Host.last_latency_ms, Host.last_checked_at)
+        )
+        return [
             {
-                "host_id": host.id,
+                "host_id": host_id,
                 "online": online,
-                "latency_ms": host.last_latency_ms,
-                "checked_at": host.last_checked_at,
+                "latency_ms": last_latency_ms,
+                "checked_at": last_checked_at,
             }
-        )
-    return health_data
+            for host_id, online, last_latency_ms, last_checked_at in result
+        ]
+
+    return await _cached_summary("health", build)
 
 
 @router.get("/summary/health-stats")
-async def health_stats(session: AsyncSession = Depends(get_async_session)) -> dict[str, int]:
-    """Return aggregated host status counts."""
-    total = (await session.execute(select(func.count()).select_from(Host))).scalar_one()
-    online = (
-        await session.execute(select(func.count()).select_from(Host).where(Host.last_status == "online"))
-    ).scalar_one()
-    offline = (
-        await session.execute(select(func.count()).select_from(Host).where(Host.last_status == "offline"))
-    ).scalar_one()
-    unknown = total - online - offline
-    return {"total": total, "online": online, "offline": offline, "unknown": unknown}
+async def health_stats(session: AsyncSession = Depends(get_async_session)) -> Response:
+    """Return aggregated host status counts (cached for ``_SUMMARY_TTL`` seconds)."""
+
+    async def build() -> dict[str, int]:
+        # Una sola fila: la clasificación online/offline la hace la DB con CASE
+        row = (
+            await session.execute(
+                select(
+                    func.count().label("total"),
+                    func.coalesce(func.sum(case((Host.last_status == "online", 1), else_=0)), 0).label("online"),
+                    func.coalesce(func.sum(case((Host.last_status == "offline", 1), else_=0)), 0).label("offline"),
+                ).select_from(Host)
+            )
+        ).one()
+        unknown = row.total - row.online - row.offline
+        return {"total": row.total, "online": row.online, "offline": row.offline, "unknown": unknown}
+
+    return await _cached_summary("health-stats", build)
+
+
+# Rutas de sondeo del dashboard: los mismos handlers, servidos además por la
+# sub-app montada en /r (main.read_app). Las rutas originales siguen igual.
+read_router = APIRouter(prefix="/hosts", tags=["hosts"])
+read_router.add_api_route(
+    "/summary/health", health_list, response_model=List[HostHealthSummary], include_in_schema=False
+)
+read_router.add_api_route("/summary/health-stats", health_stats, include_in_schema=False)
 
 
 @router.get("/{host_id}/health", response_model=HostHealthResponse | None)
@@ -244,43 +323,74 @@ async def get_host_health(host_id: int, session: AsyncSession = Depends(get_asyn
 @router.get("/{host_id}/health/history", response_model=List[HostHealthResponse])
 async def host_health_history(
     host_id: int,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    before: Optional[str] = Query(None, description="Keyset cursor ('checked_at,id') from X-Next-Cursor"),
     session: AsyncSession = Depends(get_async_session),
-) -> List[HostHealth]:
-    """Return recent health check history for a host."""
+) -> Response:
+    """Return recent health check history for a host (newest first).
+
+    When the page is full, ``X-Next-Cursor`` holds the ``before`` value
+    for the next page.
+    """
+    cursor = parse_cursor(before)
+    # Columnas de HostHealthResponse directo a orjson, sin validar fila a fila
+    query = select(
+        HostHealth.id,
+        HostHealth.host_id,
+        HostHealth.status,
+        HostHealth.latency_ms,
+        HostHealth.error_message,
+        HostHealth.checked_at,
+    ).where(HostHealth.host_id == host_id)
+    if cursor is not None:
+        query = query.where(older_than(HostHealth.checked_at, HostHealth.id, cursor))
     result = await session.execute(
-        select(HostHealth)
-        .where(HostHealth.host_id == host_id)
-        .order_by(HostHealth.checked_at.desc())
-        .limit(limit)
+        query.order_by(HostHealth.checked_at.desc(), HostHealth.id.desc()).limit(limit)
     )
-    rows = result.scalars().all()
-    return rows
+    rows = [dict(row) for row in result.mappings()]
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = make_cursor(rows[-1]["checked_at"], rows[-1]["id"])
+    return Response(content=orjson.dumps(rows), media_type="application/json", headers=headers)
 
 
 @router.get("/{host_id}/actions/history", response_model=List[ActionRunResponse])
 async def host_actions_history(
     host_id: int,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[str] = Query(None, description="Keyset cursor ('started_at,id') from X-Next-Cursor"),
+    include: Optional[str] = Query(None, description="'raw' adds stdout, stderr and response_* columns"),
     session: AsyncSession = Depends(get_async_session),
-) -> List[ActionRun]:
-    """Return recent action run history for a host."""
+) -> Response:
+    """Return recent action run history for a host (newest first).
+
+    Output columns are omitted (``null``) unless ``include=raw``. When
+    the page is full, ``X-Next-Cursor`` holds the ``before`` value for
+    the next page.
+    """
+    cursor = parse_cursor(before)
+    columns = RUN_SUMMARY_COLUMNS + RUN_OUTPUT_COLUMNS if include == "raw" else RUN_SUMMARY_COLUMNS
+    query = select(*columns).where(ActionRun.host_id == host_id)
+    if cursor is not None:
+        query = query.where(older_than(ActionRun.started_at, ActionRun.id, cursor))
     result = await session.execute(
-        select(ActionRun)
-        .where(ActionRun.host_id == host_id)
-        .order_by(ActionRun.started_at.desc())
-        .limit(limit)
+        query.order_by(ActionRun.started_at.desc(), ActionRun.id.desc()).limit(limit)
     )
-    runs = result.scalars().all()
-    return runs
+    runs = result.mappings().all()
+    if include == "raw":
+        runs = await resolve_outputs(runs)
+    headers = {}
+    if len(runs) == limit:
+        headers["X-Next-Cursor"] = make_cursor(runs[-1]["started_at"], runs[-1]["id"])
+    return Response(content=dump_runs(runs), media_type="application/json", headers=headers)
 
 
 @router.patch("/{host_id}/notify")
 async def set_notify(host_id: int, enabled: bool, session: AsyncSession = Depends(get_async_session)) -> dict[str, bool]:
     """Enable or disable Telegram notifications for a host."""
-    host = await session.get(Host, host_id)
-    if not host:
+    result = await session.execute(update(Host).where(Host.id == host_id).values(notify_enabled=bool(enabled)))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Host not found")
-    host.notify_enabled = bool(enabled)
     await session.commit()
-    return {"host_id": host_id, "notify_enabled": host.notify_enabled}
+    _invalidate_summaries()
+    return {"host_id": host_id, "notify_enabled": bool(enabled)}
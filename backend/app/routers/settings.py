@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_async_session
 from ..services.app_settings import get_telegram_schedule, set_setting_json, TELEGRAM_SCHEDULE_KEY
@@ -33,18 +34,17 @@ class SeverityThresholdsIn(BaseModel):
 
 
 @router.get("/telegram-schedule", response_model=dict)
-async def get_schedule():
-    async for session in get_async_session():
-        data = await get_telegram_schedule(session)
-        break
-    return data
+async def get_schedule(session: AsyncSession = Depends(get_async_session)):
+    return await get_telegram_schedule(session)
 
 @router.put("/telegram-schedule", response_model=dict)
-async def update_schedule(payload: TelegramScheduleIn, request: Request):
+async def update_schedule(
+    payload: TelegramScheduleIn,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+):
     # Guardar en DB
-    async for session in get_async_session():
-        await set_setting_json(session, TELEGRAM_SCHEDULE_KEY, payload.model_dump())
-        break
+    await set_setting_json(session, TELEGRAM_SCHEDULE_KEY, payload.model_dump())
 
     # Reprogramar scheduler en caliente
     svc = getattr(request.app.state, "scheduler_service", None)
@@ -56,15 +56,10 @@ async def update_schedule(payload: TelegramScheduleIn, request: Request):
     return payload.model_dump()
 
 @router.get("/telegram-severity", response_model=dict)
-async def get_severity():
-    async for session in get_async_session():
-        data = await get_telegram_severity(session)
-        break
-    return data
+async def get_severity(session: AsyncSession = Depends(get_async_session)):
+    return await get_telegram_severity(session)
 
 @router.put("/telegram-severity", response_model=dict)
-async def update_severity(payload: SeverityThresholdsIn):
-    async for session in get_async_session():
-        await set_setting_json(session, TELEGRAM_SEVERITY_KEY, payload.model_dump())
-        break
+async def update_severity(payload: SeverityThresholdsIn, session: AsyncSession = Depends(get_async_session)):
+    await set_setting_json(session, TELEGRAM_SEVERITY_KEY, payload.model_dump())
     return payload.model_dump()
@@ -156,6 +156,15 @@ class HostHealthResponse(ORMModel):
     checked_at: datetime
 
 
+class HostHealthSummary(ORMModel):
+    """Per-host entry of ``/hosts/summary/health`` (cached host status)."""
+
+    host_id: int
+    online: Optional[bool] = None
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
+
+
 # ---------------------------- Execute Action Schema ----------------------------
 
 class ExecuteActionRequest(BaseModel):
@@ -2,19 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
+import calendar
 import json
 import logging
 import re
-from datetime import datetime
-from typing import Any, Dict, Optional, List
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, List, Tuple
 
+import orjson
+from sqlalchemy import Update, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..database import AsyncSessionLocal
 from ..models import ActionRun, ActionStatus, Host
 from ..drivers import get_driver
-from ..services.telegram import send_alert, format_msg
+from ..services.telegram import enqueue_alert, format_msg
 from ..services.app_settings import get_telegram_severity
 from ..services.severity import evaluate_severity
+from ..services.run_output import store_output
 
 logger = logging.getLogger(__name__)
 
@@ -28,17 +35,55 @@ def _to_json_text(value: Any) -> Optional[str]:
     if value is None:
         return None
     if isinstance(value, str):
-        return value
+        return value  # ya es texto (JSON o no): se guarda tal cual
+    if isinstance(value, (bytes, bytearray)):
+        # Cuerpo HTTP crudo: si ya es JSON se guarda sin volver a serializar
+        try:
+            orjson.loads(value)
+            return bytes(value).decode()
+        except (orjson.JSONDecodeError, UnicodeDecodeError):
+            pass
+    try:
+        # orjson: UTF-8 sin escapes, datetime/Enum nativos; lo demás vía str()
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    except orjson.JSONEncodeError:
+        pass  # p. ej. enteros > 64 bits: json sí los admite
     try:
         return json.dumps(value, ensure_ascii=False, default=str)
     except Exception:
         return str(value)
 
 
-def _parse_mikrotik_time(s: str) -> Optional[datetime]:
+# Hora de log MikroTik "YYYY-MM-DD HH:MM:SS": con ancho fijo el orden de
+# texto es el cronológico, así que se compara como str sin crear datetime
+_MIKROTIK_TIME_RE = re.compile(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d")
+# Búsqueda sin distinguir mayúsculas, sin crear una copia en minúsculas
+_SALDO_INSUFICIENTE_RE = re.compile("saldo insuficiente", re.IGNORECASE)
+_MIKROTIK_TIME_FMT = "%Y-%m-%d %H:%M:%S"
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _mikrotik_time_key(s: str) -> Optional[str]:
+    """
+    Hora de log como texto comparable, o None si strptime la rechazaría.
+    """
+    if _MIKROTIK_TIME_RE.fullmatch(s):
+        # Camino rápido: el formato ya es el de ancho fijo, solo faltan los rangos
+        y, mo, d = int(s[0:4]), int(s[5:7]), int(s[8:10])
+        if (
+            y >= 1
+            and 1 <= mo <= 12
+            and 1 <= d <= (29 if mo == 2 and calendar.isleap(y) else _DAYS_IN_MONTH[mo])
+            and int(s[11:13]) < 24
+            and int(s[14:16]) < 60
+            and int(s[17:19]) < 60
+        ):
+            return s
+        return None
+    # Resto (p. ej. campos de un dígito): strptime y texto normalizado
     try:
-        return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
-    except Exception:
+        return datetime.strptime(s, _MIKROTIK_TIME_FMT).strftime(_MIKROTIK_TIME_FMT)
+    except ValueError:
         return None
 
 
@@ -53,8 +98,11 @@ def _ensure_mikrotik_logs(raw: Any) -> List[Dict[str, Any]]:
         return []
 
     if isinstance(raw, str):
+        # Solo interesan las líneas USSD: sin "USSD:" no vale la pena parsear
+        if "USSD:" not in raw:
+            return []
         try:
-            raw = json.loads(raw)
+            raw = orjson.loads(raw)
         except Exception:
             return []
 
@@ -64,42 +112,65 @@ def _ensure_mikrotik_logs(raw: Any) -> List[Dict[str, Any]]:
     return []
 
 
-def extract_latest_ussd(raw: Any) -> Optional[Dict[str, Any]]:
+def scan_ussd(raw: Any) -> Tuple[Optional[Dict[str, Any]], bool]:
     """
-    Devuelve SOLO el USSD más nuevo (por timestamp) desde raw (str o list).
+    Una sola pasada sobre los logs: (USSD más nuevo, hay "saldo insuficiente").
     """
-    logs = _ensure_mikrotik_logs(raw)
-
     latest: Optional[Dict[str, Any]] = None
-    latest_time: Optional[datetime] = None
-
-    for item in logs:
-        msg = str(item.get("message", "")).strip()
-        if not msg.startswith("USSD:"):
+    latest_time = ""  # texto de la hora del más nuevo ("" = sin hora válida)
+    saldo_insuficiente = False
+
+    for item in _ensure_mikrotik_logs(raw):
+        msg = item.get("message", "")
+        if not isinstance(msg, str):
+            msg = str(msg)
+        # lstrip solo si hace falta (y devuelve el mismo str si no hay espacios)
+        if not msg.startswith("USSD:") and not msg.lstrip().startswith("USSD:"):
             continue
 
-        t = _parse_mikrotik_time(str(item.get("time", ""))) or datetime.min
+        if not saldo_insuficiente and _SALDO_INSUFICIENTE_RE.search(msg):
+            saldo_insuficiente = True
 
-        if latest is None or t > (latest_time or datetime.min):
+        # Solo se valida la hora si supera (como texto) a la del más nuevo;
+        # las horas inválidas (formato o rangos) cuentan como las más viejas.
+        # Un campo de un dígito nunca queda por debajo de su forma con cero
+        # delante, así que el descarte previo no pierde candidatos
+        s = str(item.get("time", ""))
+        if latest is not None and s <= latest_time:
+            continue
+        key = _mikrotik_time_key(s)
+        if key is not None:
+            if key > latest_time:
+                latest, latest_time = item, key
+        elif latest is None:
             latest = item
-            latest_time = t
 
     if not latest:
-        return None
+        return None, saldo_insuficiente
 
-    return {"time": latest.get("time"), "message": latest.get("message")}
+    return {"time": latest.get("time"), "message": latest.get("message")}, saldo_insuficiente
+
+
+def extract_latest_ussd(raw: Any) -> Optional[Dict[str, Any]]:
+    """
+    Devuelve SOLO el USSD más nuevo (por timestamp) desde raw (str o list).
+    """
+    return scan_ussd(raw)[0]
 
 
 def has_saldo_insuficiente(raw: Any) -> bool:
     """
     True si en CUALQUIER USSD del batch aparece "saldo insuficiente".
     """
-    logs = _ensure_mikrotik_logs(raw)
-    for item in logs:
-        msg = str(item.get("message", "")).strip()
-        if msg.startswith("USSD:") and "saldo insuficiente" in msg.lower():
-            return True
-    return False
+    return scan_ussd(raw)[1]
+
+
+# Normalización del texto USSD en una sola pasada: días -> dias,
+# 1,5 -> 1.5, saltos de línea -> espacio
+_USSD_TRANS = str.maketrans({"í": "i", ",": ".", "\n": " "})
+_DATOS_RE = re.compile(r"datos\s*:\s*(\d+(?:\.\d+)?)\s*(gb|mb)\b")
+_VALIDOS_RE = re.compile(r"\bvalidos?\b\s*[:=\s]\s*(\d+)\s*dias?\b")
+_SALDO_RE = re.compile(r"\bsaldo\b\s*[:=\-]?\s*\$?\s*(\d+(?:\.\d+)?)\b")
 
 
 def parse_ussd_fields_from_message(msg: str) -> Dict[str, Any]:
@@ -118,13 +189,10 @@ def parse_ussd_fields_from_message(msg: str) -> Dict[str, Any]:
     if not msg:
         return out
 
-    t = msg.lower()
-    t = t.replace("días", "dias").replace("día", "dia")
-    t = t.replace(",", ".")  # 1,5 -> 1.5
-    t = t.replace("\n", " ")
+    t = msg.lower().translate(_USSD_TRANS)
 
     # DATOS solo desde "Datos:"
-    datos_matches = re.findall(r"datos\s*:\s*(\d+(?:\.\d+)?)\s*(gb|mb)\b", t)
+    datos_matches = _DATOS_RE.findall(t)
     if datos_matches:
         val_str, unit = datos_matches[-1]  # última ocurrencia de "Datos:"
         try:
@@ -135,7 +203,7 @@ def parse_ussd_fields_from_message(msg: str) -> Dict[str, Any]:
             pass
 
     # VALIDOS
-    m = re.search(r"\bvalidos?\b\s*[:=\s]\s*(\d+)\s*dias?\b", t)
+    m = _VALIDOS_RE.search(t)
     if m:
         try:
             out["validos_dias"] = int(m.group(1))
@@ -143,7 +211,7 @@ def parse_ussd_fields_from_message(msg: str) -> Dict[str, Any]:
             pass
 
     # SALDO (opcional)
-    m = re.search(r"\bsaldo\b\s*[:=\-]?\s*\$?\s*(\d+(?:\.\d+)?)\b", t)
+    m = _SALDO_RE.search(t)
     if m:
         try:
             out["saldo"] = float(m.group(1))
@@ -168,6 +236,70 @@ def fmt_mb(mb: Any) -> str:
 # Main logic
 # ------------------------
 
+def _last_action_update(run: ActionRun) -> Update:
+    # Resumen "última acción" en hosts (lo lee /hosts); solo si esta
+    # ejecución es la más reciente, por si dos terminan desordenadas.
+    return (
+        update(Host)
+        .where(Host.id == run.host_id)
+        .where(or_(Host.last_action_at.is_(None), Host.last_action_at <= run.started_at))
+        .values(last_action_key=run.action_key, last_action_at=run.started_at, last_action_status=run.status)
+    )
+
+
+# Commit agrupado para el scheduler: las ejecuciones que terminan dentro de
+# la misma ventana comparten una transacción (un fsync de SQLite) en vez de
+# un commit cada una. Las peticiones HTTP siguen con su propio commit.
+_BATCH_WINDOW = 0.5
+
+
+class _RunBatch:
+    """Runs waiting for the next grouped commit."""
+
+    def __init__(self) -> None:
+        self.runs: List[ActionRun] = []
+        self.done: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.task: Optional[asyncio.Task] = None
+
+
+_pending_batch: Optional[_RunBatch] = None
+
+
+async def _flush_batch(batch: _RunBatch) -> None:
+    global _pending_batch
+    try:
+        await asyncio.sleep(_BATCH_WINDOW)
+        _pending_batch = None if _pending_batch is batch else _pending_batch
+        async with AsyncSessionLocal() as session:
+            session.add_all(batch.runs)
+            for run in batch.runs:
+                await session.execute(_last_action_update(run))
+            await session.commit()
+    except Exception as exc:
+        logger.error("Failed to record %d action runs: %s", len(batch.runs), exc)
+        batch.done.set_exception(exc)
+    else:
+        batch.done.set_result(None)
+    finally:
+        # Cancelado (apagado): nadie debe quedarse esperando
+        if _pending_batch is batch:
+            _pending_batch = None
+        if not batch.done.done():
+            batch.done.cancel()
+
+
+async def _record_batched(run: ActionRun) -> None:
+    """Insert ``run`` with the next grouped commit and wait for it."""
+    global _pending_batch
+    batch = _pending_batch
+    if batch is None or batch.task is None or batch.task.done():
+        batch = _pending_batch = _RunBatch()
+        batch.task = asyncio.create_task(_flush_batch(batch))
+    batch.runs.append(run)
+    # shield: cancelar a un llamador no debe cancelar el commit de los demás
+    await asyncio.shield(batch.done)
+
+
 async def execute_and_record(
     session: AsyncSession,
     host: Host,
@@ -176,11 +308,13 @@ async def execute_and_record(
     attempt: int = 1,
     max_attempts: int = 1,
     telegram_enabled: bool = True,
+    batch_commit: bool = False,  # True: commit agrupado (_record_batched)
     **params: Any,
 ) -> ActionRun:
     driver = get_driver(host.router_type)
 
     start_time = datetime.utcnow()
+    t0 = time.perf_counter_ns()
 
     status = ActionStatus.SUCCESS.value
     stdout: Optional[Any] = None
@@ -189,17 +323,15 @@ async def execute_and_record(
     response_parsed: Optional[Any] = None
     error_message: Optional[str] = None
 
-    # Para alertas USSD (en memoria, raw puede ser str o list)
-    ussd_raw_for_alerts: Optional[Any] = None
+    # Para alertas USSD (se calcula en la misma pasada que el último USSD)
+    saldo_insuficiente = False
 
     try:
         result: Dict[str, Any] = await driver.execute_action(host, action_key, **params)
         response_raw = result.get("raw")
 
         if action_key == "VER_LOGS_USSD":
-            ussd_raw_for_alerts = response_raw
-
-            latest = extract_latest_ussd(response_raw)
+            latest, saldo_insuficiente = scan_ussd(response_raw)
             response_parsed = {"ussd_latest": latest}
 
             # Parsear campos desde el texto del último USSD (si existe)
@@ -222,12 +354,16 @@ async def execute_and_record(
         stderr = str(exc)
         logger.error("Action %s on host %s failed: %s", action_key, host.id, exc)
 
-    finish_time = datetime.utcnow()
-    duration_ms = (finish_time - start_time).total_seconds() * 1000.0
+    # Duración con reloj monótono; el fin se deriva de ella (un reloj menos)
+    duration_ns = time.perf_counter_ns() - t0
+    finish_time = start_time + timedelta(microseconds=duration_ns // 1000)
+    duration_ms = duration_ns / 1_000_000
 
     # ------------------------
     # Persist
     # ------------------------
+    stdout_text = _to_json_text(stdout)
+    parsed_text = _to_json_text(response_parsed)
     run = ActionRun(
         host_id=host.id,
         router_type=host.router_type,
@@ -236,52 +372,58 @@ async def execute_and_record(
         finished_at=finish_time,
         duration_ms=duration_ms,
         status=status,
-        stdout=_to_json_text(stdout),
+        stdout=await store_output(stdout_text),
         stderr=_to_json_text(stderr),
-        response_parsed=_to_json_text(response_parsed),
+        response_parsed=await store_output(parsed_text),
         response_raw=None,
         error_message=error_message,
     )
 
-    session.add(run)
-    await session.commit()
-    await session.refresh(run)
+    if batch_commit:
+        await _record_batched(run)
+    else:
+        session.add(run)
+        await session.execute(_last_action_update(run))
+        # expire_on_commit=False: run ya tiene id (RETURNING) y los valores
+        # asignados aquí; no hace falta releerlo con refresh
+        await session.commit()
+        session.expunge(run)
+    # Quien llama recibe la salida completa, no la referencia {"@file": ...}
+    run.stdout = stdout_text
+    run.response_parsed = parsed_text
 
     # ------------------------
     # Alerts (formato unificado)
     # ------------------------
     if telegram_enabled and status == ActionStatus.SUCCESS.value and action_key == "VER_LOGS_USSD":
-        parsed = response_parsed if isinstance(response_parsed, dict) else None
-        latest = parsed.get("ussd_latest") if parsed else None
+        # response_parsed es el dict armado arriba: campos leídos una sola vez
+        parsed = response_parsed if isinstance(response_parsed, dict) else {}
+        latest = parsed.get("ussd_latest")
+        ok_parse = parsed.get("ok_parse") is True
+        datos_mb = parsed.get("datos_mb")
+        validos_dias = parsed.get("validos_dias")
+        saldo = parsed.get("saldo")
+        when = parsed.get("time") or datetime.utcnow().isoformat()
+        estado = (
+            "📊 Estado",
+            [
+                f"• Datos: {fmt_mb(datos_mb)}",
+                f"• Vigencia: {validos_dias if validos_dias is not None else 'n/a'} días",
+                f"• Saldo: {saldo if saldo is not None else 'n/a'}",
+            ],
+        )
 
         # 1) USSD (último) — formateado
         if latest and latest.get("message"):
-            raw_msg = str(latest.get("message"))
-            t = (parsed.get("time") if parsed else None) or latest.get("time") or datetime.utcnow().isoformat()
-
-            datos_mb = parsed.get("datos_mb") if parsed else None
-            validos_dias = parsed.get("validos_dias") if parsed else None
-            saldo = parsed.get("saldo") if parsed else None
-            ok_parse = bool(parsed and parsed.get("ok_parse") is True)
-
-            sections = []
-            if ok_parse:
-                sections.append(
-                    ("📊 Estado", [
-                        f"• Datos: {fmt_mb(datos_mb)}",
-                        f"• Vigencia: {validos_dias if validos_dias is not None else 'n/a'} días",
-                        f"• Saldo: {saldo if saldo is not None else 'n/a'}",
-                    ])
-                )
-
+            sections = [estado] if ok_parse else []
             # Siempre incluimos el texto original como “Detalle”
-            sections.append(("📝 Detalle USSD", [raw_msg]))
+            sections.append(("📝 Detalle USSD", [str(latest.get("message"))]))
 
             message = format_msg(
                 title="📟 USSD — Último",
                 host_name=host.name,
                 host_ip=host.ip,
-                when=t,
+                when=when,
                 sections=sections,
                 suggested=[
                     "Si el saldo o vigencia no coincide, repetir consulta",
@@ -289,10 +431,10 @@ async def execute_and_record(
                 ],
                 footer="⚙️ Origen: Comando USSD",
             )
-            await send_alert(host.id, "ussd_latest", message)
+            enqueue_alert(host.id, "ussd_latest", message)
 
         # 2) Saldo insuficiente — formateado
-        if ussd_raw_for_alerts is not None and has_saldo_insuficiente(ussd_raw_for_alerts):
+        if saldo_insuficiente:
             message = format_msg(
                 title="🧨 ALERTA — Saldo insuficiente",
                 host_name=host.name,
@@ -307,15 +449,10 @@ async def execute_and_record(
                 ],
                 footer="⚙️ Origen: Comando USSD",
             )
-            await send_alert(host.id, "low_balance", message)
+            enqueue_alert(host.id, "low_balance", message)
 
         # 3) Severidad configurable desde el front — formateado
-        if parsed and parsed.get("ok_parse") is True:
-            datos_mb = parsed.get("datos_mb")
-            validos_dias = parsed.get("validos_dias")
-            saldo = parsed.get("saldo")
-            t = parsed.get("time") or datetime.utcnow().isoformat()
-
+        if ok_parse:
             thresholds = await get_telegram_severity(session)
             sev = evaluate_severity(datos_mb, validos_dias, thresholds)
 
@@ -331,21 +468,15 @@ async def execute_and_record(
                     title=f"{icon} {title}",
                     host_name=host.name,
                     host_ip=host.ip,
-                    when=t,
-                    sections=[
-                        ("📊 Estado", [
-                            f"• Datos: {fmt_mb(datos_mb)}",
-                            f"• Vigencia: {validos_dias if validos_dias is not None else 'n/a'} días",
-                            f"• Saldo: {saldo if saldo is not None else 'n/a'}",
-                        ])
-                    ],
+                    when=when,
+                    sections=[estado],
                     suggested=[
                         "Planificar recarga/renovación según umbrales",
                         "Verificar consumo inusual si datos bajan rápido",
                     ],
                     footer="⚙️ Origen: USSD (parseado)",
                 )
-                await send_alert(host.id, f"sev_{sev.lower()}", message)
+                enqueue_alert(host.id, f"sev_{sev.lower()}", message)
 
     # 4) Falla (sin respuesta) — formateado
     if telegram_enabled and status == ActionStatus.FAIL.value and attempt >= max_attempts:
@@ -365,6 +496,6 @@ async def execute_and_record(
             ],
             footer="⚙️ Origen: Ejecución de acción",
         )
-        await send_alert(host.id, "no_response", message)
+        enqueue_alert(host.id, "no_response", message)
 
     return run
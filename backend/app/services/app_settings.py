@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+import time
+from datetime import datetime
+from typing import Any, Dict, Tuple
 
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import AppSetting
@@ -25,23 +29,50 @@ DEFAULT_SEVERITY = {
 }
 
 
+# Valores ya parseados por clave: (instante, valor). Los ajustes cambian
+# muy de vez en cuando y se leen en cada acción USSD; set_setting_json
+# invalida la clave, el TTL acota lo que tarda en verse un cambio hecho
+# desde otro proceso. El valor es compartido: no modificarlo.
+_SETTINGS_TTL = 60.0
+_settings_cache: Dict[str, Tuple[float, Any]] = {}
+_MISSING = object()
+
+# Dialectos con INSERT ... ON CONFLICT (el resto usa SELECT + UPDATE/INSERT)
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
 async def get_setting_json(session: AsyncSession, key: str, default: Any = None) -> Any:
-    row = await session.get(AppSetting, key)
-    if not row or not row.value:
-        return default
-    try:
-        return json.loads(row.value)
-    except Exception:
-        return default
+    cached = _settings_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _SETTINGS_TTL:
+        value = cached[1]
+    else:
+        row = await session.get(AppSetting, key)
+        value = _MISSING
+        if row and row.value:
+            try:
+                value = json.loads(row.value)
+            except Exception:
+                pass
+        _settings_cache[key] = (time.monotonic(), value)
+    return default if value is _MISSING else value
 
 async def set_setting_json(session: AsyncSession, key: str, value: Any) -> None:
-    row = await session.get(AppSetting, key)
     s = json.dumps(value, ensure_ascii=False)
-    if row:
-        row.value = s
+    upsert = _UPSERT_INSERTS.get(session.bind.dialect.name)
+    if upsert is not None:
+        # INSERT ... ON CONFLICT(key) DO UPDATE: una sentencia, sin SELECT previo
+        now = datetime.utcnow()
+        stmt = upsert(AppSetting).values(key=key, value=s, updated_at=now)
+        stmt = stmt.on_conflict_do_update(index_elements=[AppSetting.key], set_={"value": s, "updated_at": now})
+        await session.execute(stmt)
     else:
-        session.add(AppSetting(key=key, value=s))
+        row = await session.get(AppSetting, key)
+        if row:
+            row.value = s
+        else:
+            session.add(AppSetting(key=key, value=s))
     await session.commit()
+    _settings_cache.pop(key, None)
 
 async def get_telegram_schedule(session: AsyncSession) -> dict:
     data = await get_setting_json(session, TELEGRAM_SCHEDULE_KEY, None)
@@ -8,18 +8,19 @@ summary of host statuses and recent alerts.
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import time
 from datetime import datetime
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import desc, func, select
+import orjson
+from sqlalchemy import desc, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..drivers import get_driver
 from ..models import Host, HostHealth, ActionRun, ActionStatus
-from ..services.telegram import send_alert
+from ..services.telegram import enqueue_alert, send_alert
 from ..services.app_settings import get_telegram_severity
 from ..services.severity import evaluate_severity
 
@@ -51,10 +52,11 @@ def fmt_dt_short(iso_or_dt: Any) -> str:
         return str(iso_or_dt)
 
 
-def host_line(name: str, ip: str, datos_mb: Any, validos_dias: Any, saldo: Any) -> str:
+def host_line(name: str, ip: str, datos: str, validos_dias: Any, saldo: Any) -> str:
+    """``datos`` ya formateado con ``fmt_mb``."""
     vd = validos_dias if validos_dias is not None else "n/a"
     sa = saldo if saldo is not None else "n/a"
-    return f"• {name} ({ip}) — Datos: {fmt_mb(datos_mb)} | Vigencia: {vd}d | Saldo: {sa}"
+    return f"• {name} ({ip}) — Datos: {datos} | Vigencia: {vd}d | Saldo: {sa}"
 
 
 # ------------------------
@@ -64,29 +66,42 @@ def host_line(name: str, ip: str, datos_mb: Any, validos_dias: Any, saldo: Any)
 async def get_latest_ussd_parsed_map(session: AsyncSession, host_ids: List[int]) -> dict:
     """
     Devuelve {host_id: parsed_dict} con el último VER_LOGS_USSD SUCCESS por host.
-    parsed_dict viene de ActionRun.response_parsed (json text).
+    parsed_dict viene de ActionRun.response_parsed (json text, leído con orjson).
     """
     if not host_ids:
         return {}
 
-    stmt = (
-        select(ActionRun.host_id, ActionRun.response_parsed, ActionRun.started_at)
-        .where(ActionRun.host_id.in_(host_ids))
-        .where(ActionRun.action_key == "VER_LOGS_USSD")
-        .where(ActionRun.status == ActionStatus.SUCCESS.value)
-        .order_by(ActionRun.host_id, desc(ActionRun.started_at))
+    ussd_ok = (
+        ActionRun.host_id.in_(host_ids),
+        ActionRun.action_key == "VER_LOGS_USSD",
+        ActionRun.status == ActionStatus.SUCCESS.value,
     )
+    # Solo la última lectura de cada host (no todo el historial USSD); a
+    # igual started_at gana el id mayor, así sale una fila por host.
+    ranked = (
+        select(
+            ActionRun.host_id,
+            ActionRun.response_parsed,
+            func.row_number()
+            .over(
+                partition_by=ActionRun.host_id,
+                order_by=(desc(ActionRun.started_at), desc(ActionRun.id)),
+            )
+            .label("rn"),
+        )
+        .where(*ussd_ok)
+        .subquery()
+    )
+    stmt = select(ranked.c.host_id, ranked.c.response_parsed).where(ranked.c.rn == 1)
 
     rows = (await session.execute(stmt)).all()
 
     out = {}
-    for host_id, resp_txt, _started_at in rows:
-        if host_id in out:
-            continue
+    for host_id, resp_txt in rows:
         if not resp_txt:
             continue
         try:
-            d = json.loads(resp_txt) if isinstance(resp_txt, str) else resp_txt
+            d = orjson.loads(resp_txt) if isinstance(resp_txt, str) else resp_txt
             if isinstance(d, dict):
                 out[host_id] = d
         except Exception:
@@ -107,6 +122,35 @@ async def last_n_statuses(session: AsyncSession, host_id: int, n: int = 6) -> Li
     return [r[0] for r in rows.all()]
 
 
+async def last_n_statuses_many(session: AsyncSession, host_ids: List[int], n: int = 6) -> Dict[int, List[str]]:
+    """
+    Igual que last_n_statuses pero para varios hosts en una sola consulta:
+    {host_id: [estados, más recientes primero]}.
+    """
+    if not host_ids:
+        return {}
+    ranked = (
+        select(
+            HostHealth.host_id,
+            HostHealth.status,
+            func.row_number()
+            .over(partition_by=HostHealth.host_id, order_by=HostHealth.checked_at.desc())
+            .label("rn"),
+        )
+        .where(HostHealth.host_id.in_(host_ids))
+        .subquery()
+    )
+    rows = await session.execute(
+        select(ranked.c.host_id, ranked.c.status)
+        .where(ranked.c.rn <= n)
+        .order_by(ranked.c.host_id, ranked.c.rn)
+    )
+    out: Dict[int, List[str]] = {hid: [] for hid in host_ids}
+    for host_id, status in rows.all():
+        out[host_id].append(status)
+    return out
+
+
 def should_alert_offline_confirmed(last_statuses: List[str], required: int = 5) -> bool:
     """
     Regla anti-spam:
@@ -134,45 +178,70 @@ def should_alert_offline_confirmed(last_statuses: List[str], required: int = 5)
 # Checks
 # ------------------------
 
-async def check_host(session: AsyncSession, host: Host) -> HostHealth:
-    """Check the connectivity of a single host and persist the result."""
-    driver = get_driver(host.router_type)
+_NOT_PROBED = object()
+# Chequeos validate() en paralelo por ciclo (sockets/SSH abiertos a la vez)
+_VALIDATE_CONCURRENCY = 32
 
-    previous_status: Optional[str] = host.last_status
-    status: str = "offline"
-    latency_ms: Optional[float] = None
-    error_message: Optional[str] = None
 
+async def _validate(host: Host) -> Any:
+    """Latency in ms of ``driver.validate(host)``, or the exception it raised."""
+    driver = get_driver(host.router_type)
     start = time.perf_counter()
     try:
         await driver.validate(host)
-        elapsed = (time.perf_counter() - start) * 1000.0
-        latency_ms = elapsed
-        status = "online"
     except Exception as exc:
-        status = "offline"
-        error_message = str(exc)
         logger.debug("Health check for host %s failed: %s", host.id, exc)
+        return exc
+    return (time.perf_counter() - start) * 1000.0
+
+
+async def check_host(
+    session: AsyncSession,
+    host: Host,
+    probe: Any = _NOT_PROBED,
+    previous_statuses: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Check the connectivity of a single host and return its health row.
+
+    ``probe`` is the latency already measured by a batch check
+    (``None`` = no reply, an exception = failed validate); when omitted,
+    ``driver.validate`` is called. ``previous_statuses`` are the last
+    stored statuses (most recent first), queried here when not given.
+    The host cache fields are updated in the session; the returned
+    ``host_health`` values are inserted by the caller (in bulk). Alerts
+    are queued (``enqueue_alert``), not sent while the session is open.
+    """
+    previous_status: Optional[str] = host.last_status
+    status: str = "offline"
+    latency_ms: Optional[float] = None
+    error_message: Optional[str] = None
+
+    if probe is _NOT_PROBED:
+        probe = await _validate(host)
+    if probe is None:
+        error_message = "Ping failed"
+    elif isinstance(probe, Exception):
+        error_message = str(probe)
+    else:
+        latency_ms = float(probe)
+        status = "online"
 
     now = datetime.utcnow()
 
-    # Persist health row
-    health = HostHealth(
-        host_id=host.id,
-        status=status,
-        latency_ms=latency_ms,
-        error_message=error_message,
-        checked_at=now,
-    )
-    session.add(health)
+    # Health row (la inserta check_all_hosts junto a las del resto)
+    health = {
+        "host_id": host.id,
+        "status": status,
+        "latency_ms": latency_ms,
+        "error_message": error_message,
+        "checked_at": now,
+    }
 
     # Update host cache fields
     host.last_status = status
     host.last_checked_at = now
     host.last_latency_ms = latency_ms
 
-    # Importante: flush para que el health recién creado se vea en queries del mismo ciclo
-    await session.flush()
 
     # ------------------------
     # Telegram alerts (anti-spam OFFLINE + formato estructurado)
@@ -195,11 +264,15 @@ async def check_host(session: AsyncSession, host: Host) -> HostHealth:
                         "• Confirmar estabilidad en el panel\n"
                         "• Ejecutar una acción (si aplica)"
                     )
-                    await send_alert(host.id, "host_online", msg)
+                    enqueue_alert(host.id, "host_online", msg)
 
             else:
                 # OFFLINE: anti-spam → alertar solo cuando se cumple 5 OFFLINE seguidos (primera vez)
-                last6 = await last_n_statuses(session, host.id, 6)
+                # El chequeo actual aún no está en la DB: se antepone a los 5 previos
+                if previous_statuses is None:
+                    with session.no_autoflush:
+                        previous_statuses = await last_n_statuses(session, host.id, 5)
+                last6 = [status, *previous_statuses[:5]]
                 if should_alert_offline_confirmed(last6, required=5):
                     msg = (
                         "🔴 OFFLINE — Confirmado (5 chequeos)\n"
@@ -214,7 +287,7 @@ async def check_host(session: AsyncSession, host: Host) -> HostHealth:
                         "• Verificar que el router esté encendido\n"
                         "• Intentar un chequeo manual"
                     )
-                    await send_alert(host.id, "host_offline_confirmed", msg)
+                    enqueue_alert(host.id, "host_offline_confirmed", msg)
 
         except Exception as exc:
             logger.error("Failed to send health alert for host %s: %s", host.id, exc)
@@ -222,13 +295,57 @@ async def check_host(session: AsyncSession, host: Host) -> HostHealth:
     return health
 
 
-async def check_all_hosts(session: AsyncSession) -> List[HostHealth]:
-    """Check all hosts and return a list of health entries."""
+async def check_all_hosts(session: AsyncSession) -> List[Dict[str, Any]]:
+    """Check all hosts, store one health row each and return those rows."""
     result = await session.execute(select(Host))
     hosts = result.scalars().all()
-    checks: List[HostHealth] = []
+
+    # Un solo chequeo por lote para cada driver que lo soporte (ping ICMP
+    # concurrente en TP-Link); el resto cae al validate por host.
+    by_type: Dict[str, List[Host]] = {}
     for host in hosts:
-        checks.append(await check_host(session, host))
+        by_type.setdefault(host.router_type, []).append(host)
+    probes: Dict[int, Any] = {}
+
+    async def batch_probe(router_type: str, group: List[Host]) -> None:
+        try:
+            batch = await get_driver(router_type).validate_many(group)
+        except Exception as exc:
+            logger.debug("Batch health check for %s failed: %s", router_type, exc)
+            batch = None
+        if batch:
+            probes.update(batch)
+
+    await asyncio.gather(*(batch_probe(rt, group) for rt, group in by_type.items()))
+
+    # Hosts sin chequeo por lote: validate() concurrente (acotado); la
+    # sesión no se comparte, check_host después va uno a uno sin red.
+    semaphore = asyncio.Semaphore(_VALIDATE_CONCURRENCY)
+
+    async def single_probe(host: Host) -> None:
+        async with semaphore:
+            probes[host.id] = await _validate(host)
+
+    await asyncio.gather(*(single_probe(h) for h in hosts if h.id not in probes))
+
+    # Historial para el anti-spam OFFLINE: una consulta para todos los
+    # hosts caídos con avisos activos, no una por host.
+    offline_ids = [
+        h.id for h in hosts
+        if h.notify_enabled and (probes.get(h.id) is None or isinstance(probes[h.id], Exception))
+    ]
+    with session.no_autoflush:
+        previous = await last_n_statuses_many(session, offline_ids, 5)
+
+    checks: List[Dict[str, Any]] = []
+    for host in hosts:
+        checks.append(
+            await check_host(session, host, probes.get(host.id, _NOT_PROBED), previous.get(host.id))
+        )
+    # Todas las filas del ciclo en un solo executemany (sin RETURNING por
+    # fila); el UPDATE de los campos cache de hosts sale agrupado al flush.
+    if checks:
+        await session.execute(insert(HostHealth.__table__), checks)
     return checks
 
 
@@ -236,6 +353,39 @@ async def check_all_hosts(session: AsyncSession) -> List[HostHealth]:
 # Daily summary
 # ------------------------
 
+# Plantillas de los mensajes por host (se arman una vez, no por host)
+_DAILY_OFFLINE_TMPL = (
+    "🔴 OFFLINE — Host sin respuesta\n"
+    "━━━━━━━━━━━━━━━━━━━━\n"
+    "📍 Host: {name}\n"
+    "🌐 IP: {ip}\n"
+    "🕒 UTC: {ts}Z\n\n"
+    "Acción sugerida:\n"
+    "• Revisar conectividad / VPN / energía\n"
+    "• Intentar validar desde el panel"
+)
+
+_DAILY_SEV_TMPL = (
+    "{icon} {title}\n"
+    "━━━━━━━━━━━━━━━━━━━━\n"
+    "📍 Host: {name}\n"
+    "🌐 IP: {ip}\n"
+    "🕒 Lectura: {t}\n\n"
+    "📊 Estado\n"
+    "• Datos: {datos}\n"
+    "• Vigencia: {vigencia} días\n"
+    "• Saldo: {saldo}\n\n"
+    "⚙️ Origen: USSD"
+)
+
+_SEV_ICON = {"CRÍTICO": "🚨", "ALTA": "⚠️", "MEDIA": "🟡"}
+_SEV_TITLE = {
+    "CRÍTICO": "CRÍTICO — Atención inmediata",
+    "ALTA": "ALTA — Atención requerida",
+    "MEDIA": "MEDIA — Preventiva",
+}
+
+
 async def send_daily_summary(session: AsyncSession) -> None:
     now = datetime.utcnow()
 
@@ -243,24 +393,21 @@ async def send_daily_summary(session: AsyncSession) -> None:
     thresholds = await get_telegram_severity(session)
 
     # --------------------
-    # 1) Estado actual
+    # 1) Estado actual (total y offline salen de la misma lista de hosts)
     # --------------------
-    total_hosts = (await session.execute(select(func.count()).select_from(Host))).scalar_one()
+    host_rows = (
+        await session.execute(select(Host.id, Host.name, Host.ip, Host.last_status).order_by(Host.name.asc()))
+    ).all()
+    hosts: List[Tuple[int, str, str]] = [(hid, name, ip) for hid, name, ip, _status in host_rows]
+    offline_hosts = [(hid, name, ip) for hid, name, ip, status in host_rows if status == "offline"]
 
-    offline_rows = await session.execute(
-        select(Host.id, Host.name, Host.ip)
-        .where(Host.last_status == "offline")
-        .order_by(Host.name.asc())
-    )
-    offline_hosts = offline_rows.all()
+    total_hosts = len(hosts)
     offline_now = len(offline_hosts)
     online_now = max(total_hosts - offline_now, 0)
 
     # --------------------
     # 2) Último VER_LOGS_USSD por host (para severidad)
     # --------------------
-    host_rows = await session.execute(select(Host.id, Host.name, Host.ip).order_by(Host.name.asc()))
-    hosts: List[Tuple[int, str, str]] = host_rows.all()
 
     host_ids = [hid for (hid, _n, _ip) in hosts]
     latest_parsed_by_host = await get_latest_ussd_parsed_map(session, host_ids)
@@ -269,7 +416,8 @@ async def send_daily_summary(session: AsyncSession) -> None:
     high_lines: List[str] = []
     med_lines: List[str] = []
 
-    per_host_alerts: List[Tuple[int, str, str, str]] = []  # (host_id, sev, name, ip)
+    # (host_id, sev, name, ip, datos formateado, validos_dias, saldo, time)
+    per_host_alerts: List[Tuple[int, str, str, str, str, Any, Any, Any]] = []
 
     for host_id, name, ip in hosts:
         parsed = latest_parsed_by_host.get(host_id)
@@ -284,7 +432,8 @@ async def send_daily_summary(session: AsyncSession) -> None:
         if not sev:
             continue
 
-        line = host_line(name, ip, datos_mb, validos_dias, saldo)
+        datos_txt = fmt_mb(datos_mb)
+        line = host_line(name, ip, datos_txt, validos_dias, saldo)
 
         if sev == "CRÍTICO":
             crit_lines.append(line)
@@ -293,7 +442,7 @@ async def send_daily_summary(session: AsyncSession) -> None:
         elif sev == "MEDIA":
             med_lines.append(line)
 
-        per_host_alerts.append((host_id, sev, name, ip))
+        per_host_alerts.append((host_id, sev, name, ip, datos_txt, validos_dias, saldo, parsed.get("time")))
 
     # --------------------
     # 3) Mensaje global (1 solo)
@@ -339,48 +488,27 @@ async def send_daily_summary(session: AsyncSession) -> None:
 
     # --------------------
     # 4) Mensaje por host OFFLINE (del resumen diario)
+    # Los mensajes por host (4 y 5) van a la cola de alertas: los workers
+    # de telegram los envían en paralelo (acotado) tras el resumen.
     # --------------------
+    ts = now.isoformat()
     for host_id, name, ip in offline_hosts:
-        msg = (
-            "🔴 OFFLINE — Host sin respuesta\n"
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            f"📍 Host: {name}\n"
-            f"🌐 IP: {ip}\n"
-            f"🕒 UTC: {now.isoformat()}Z\n\n"
-            "Acción sugerida:\n"
-            "• Revisar conectividad / VPN / energía\n"
-            "• Intentar validar desde el panel"
-        )
-        await send_alert(host_id, "daily_offline", msg)
+        msg = _DAILY_OFFLINE_TMPL.format(name=name, ip=ip, ts=ts)
+        enqueue_alert(host_id, "daily_offline", msg)
 
     # --------------------
     # 5) Un mensaje por host con severidad (CRÍTICO/ALTA/MEDIA)
     # --------------------
-    for host_id, sev, name, ip in per_host_alerts:
-        parsed = latest_parsed_by_host.get(host_id) or {}
-        t = parsed.get("time") or now.isoformat()
-        datos_mb = parsed.get("datos_mb")
-        validos_dias = parsed.get("validos_dias")
-        saldo = parsed.get("saldo")
-
-        icon = {"CRÍTICO": "🚨", "ALTA": "⚠️", "MEDIA": "🟡"}.get(sev, "ℹ️")
-        title = {
-            "CRÍTICO": "CRÍTICO — Atención inmediata",
-            "ALTA": "ALTA — Atención requerida",
-            "MEDIA": "MEDIA — Preventiva",
-        }.get(sev, f"{sev} — Estado")
-
-        msg = (
-            f"{icon} {title}\n"
-            "━━━━━━━━━━━━━━━━━━━━\n"
-            f"📍 Host: {name}\n"
-            f"🌐 IP: {ip}\n"
-            f"🕒 Lectura: {t}\n\n"
-            "📊 Estado\n"
-            f"• Datos: {fmt_mb(datos_mb)}\n"
-            f"• Vigencia: {validos_dias if validos_dias is not None else 'n/a'} días\n"
-            f"• Saldo: {saldo if saldo is not None else 'n/a'}\n\n"
-            "⚙️ Origen: USSD"
+    for host_id, sev, name, ip, datos_txt, validos_dias, saldo, t in per_host_alerts:
+        msg = _DAILY_SEV_TMPL.format(
+            icon=_SEV_ICON.get(sev, "ℹ️"),
+            title=_SEV_TITLE.get(sev) or f"{sev} — Estado",
+            name=name,
+            ip=ip,
+            t=t or ts,
+            datos=datos_txt,
+            vigencia=validos_dias if validos_dias is not None else "n/a",
+            saldo=saldo if saldo is not None else "n/a",
         )
 
-        await send_alert(host_id, f"daily_sev_{sev.lower()}", msg)
+        enqueue_alert(host_id, f"daily_sev_{sev.lower()}", msg)
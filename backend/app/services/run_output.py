@@ -0,0 +1,124 @@
+"""Keep large action outputs out of the action_runs table.
+
+Outputs above ``run_output_inline_max_bytes`` are written gzip-compressed
+under ``run_output_dir`` and the column stores ``{"@file": "<name>"}``.
+History endpoints resolve those references back to the original text.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import uuid
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import orjson
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_REF_PREFIX = '{"@file":'
+# Prefijo de la referencia tal como queda en cada columna (response_parsed
+# guarda el texto JSON codificado como string JSON); para filtrar en SQL.
+STORED_REF_PREFIXES = {"stdout": _REF_PREFIX, "response_parsed": orjson.dumps(_REF_PREFIX).decode()[:-1]}
+# Columna -> se lee como texto JSON (response_parsed es JSON: el texto
+# guardado llega codificado como string JSON, ver RUN_OUTPUT_COLUMNS)
+OUTPUT_FIELDS = {"stdout": False, "response_parsed": True}
+
+
+def _write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(gzip.compress(text.encode(), compresslevel=6))
+
+
+def _read(path: str) -> str:
+    with open(path, "rb") as fh:
+        return gzip.decompress(fh.read()).decode()
+
+
+async def store_output(text: Optional[str]) -> Optional[str]:
+    """Return ``text`` as-is, or a file reference when it is too large."""
+    settings = get_settings()
+    if text is None or len(text) <= settings.run_output_inline_max_bytes:
+        return text
+    name = f"{uuid.uuid4().hex}.json.gz"
+    try:
+        await asyncio.to_thread(_write, os.path.join(settings.run_output_dir, name), text)
+    except OSError as exc:
+        logger.warning("Could not write run output to disk, storing inline: %s", exc)
+        return text
+    return orjson.dumps({"@file": name}).decode()
+
+
+def _file_ref(value: Any, json_column: bool) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    try:
+        if json_column:
+            if not value.startswith('"'):
+                return None
+            value = orjson.loads(value)
+        if not value.startswith(_REF_PREFIX):
+            return None
+        name = orjson.loads(value).get("@file")
+    except orjson.JSONDecodeError:
+        return None
+    # Solo nombres simples: nada de rutas fuera de run_output_dir
+    if not isinstance(name, str) or os.path.basename(name) != name:
+        return None
+    return name
+
+
+async def resolve_outputs(rows: Iterable[Mapping[str, Any]]) -> List[Mapping[str, Any]]:
+    """Replace file references in the output columns of ``rows``."""
+    out: List[Mapping[str, Any]] = []
+    base = get_settings().run_output_dir
+    for row in rows:
+        resolved: Optional[Dict[str, Any]] = None
+        for field, json_column in OUTPUT_FIELDS.items():
+            name = _file_ref(row.get(field), json_column)
+            if name is None:
+                continue
+            try:
+                text = await asyncio.to_thread(_read, os.path.join(base, name))
+            except (OSError, EOFError) as exc:
+                logger.warning("Run output %s unavailable: %s", name, exc)
+                continue  # se deja la referencia
+            if resolved is None:
+                resolved = dict(row)
+            resolved[field] = orjson.dumps(text).decode() if json_column else text
+        out.append(resolved if resolved is not None else row)
+    return out
+
+
+def output_files(rows: Iterable[Mapping[str, Any]]) -> List[str]:
+    """Names of the spilled files referenced by the output columns of ``rows``."""
+    names = []
+    for row in rows:
+        for field, json_column in OUTPUT_FIELDS.items():
+            name = _file_ref(row.get(field), json_column)
+            if name is not None:
+                names.append(name)
+    return names
+
+
+def _remove(paths: List[str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning("Could not remove run output %s: %s", path, exc)
+
+
+async def remove_output_files(names: Iterable[str]) -> None:
+    """Delete spilled output files (their rows are already gone)."""
+    base = get_settings().run_output_dir
+    paths = [os.path.join(base, name) for name in names]
+    if paths:
+        await asyncio.to_thread(_remove, paths)
@@ -15,7 +15,7 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy import select
 
-from ..config import settings
+from ..config import get_settings
 from ..database import get_async_session
 from ..models import AutomationRule, Host
 from ..services.action_runner import execute_and_record
@@ -35,13 +35,13 @@ class SchedulerService:
     async def start(self) -> None:
         """Start the scheduler and load jobs from the database."""
         self.scheduler.start()
-        await self.load_jobs()
+        await self.bulk_load_jobs()
 
         # -------------------------
         # Health checks job
         # -------------------------
         try:
-            interval_seconds = int(getattr(settings, "health_interval_seconds", 300) or 300)
+            interval_seconds = int(getattr(get_settings(), "health_interval_seconds", 300) or 300)
 
             async def health_job() -> None:
                 async for session in get_async_session():
@@ -86,7 +86,7 @@ class SchedulerService:
         enabled = bool((sched or {}).get("enabled", True))
         hour = int((sched or {}).get("hour", 9))
         minute = int((sched or {}).get("minute", 0))
-        tz = str((sched or {}).get("timezone", getattr(settings, "scheduler_timezone", "UTC")))
+        tz = str((sched or {}).get("timezone", getattr(get_settings(), "scheduler_timezone", "UTC")))
 
         try:
             if self.scheduler.get_job("daily_summary"):
@@ -118,20 +118,44 @@ class SchedulerService:
 
         logger.info("Daily summary scheduled at %02d:%02d (%s)", hour, minute, tz)
 
-    async def load_jobs(self) -> None:
-        """Load automation rules from the database and schedule them."""
+    async def bulk_load_jobs(self) -> None:
+        """Schedule every enabled automation rule from a single query.
+
+        Used once at startup; API-driven creates/updates go through
+        ``add_job`` for the single rule they touch.
+        """
         async for session in get_async_session():
+            # El JOIN descarta reglas de hosts borrados, como hace add_job
             result = await session.execute(
-                select(AutomationRule.id).where(AutomationRule.enabled == True)
+                select(AutomationRule.id, AutomationRule.schedule)
+                .join(Host, Host.id == AutomationRule.host_id)
+                .where(AutomationRule.enabled == True)
             )
-            rule_ids = [row[0] for row in result.all()]
+            rules = result.all()
             break
 
-        for rule_id in rule_ids:
-            await self.add_job(rule_id)
+        for rule_id, schedule in rules:
+            self._schedule_rule(rule_id, schedule)
 
         logger.info("Loaded %d automation jobs", len(self.scheduler.get_jobs()))
 
+    def _schedule_rule(self, rule_id: int, schedule: str | None) -> bool:
+        """(Re)place the APScheduler job of a rule. No DB access."""
+        job_id = f"automation-{rule_id}"
+
+        schedule = (schedule or "").strip()
+        try:
+            trigger = CronTrigger.from_crontab(schedule)
+        except Exception as e:
+            logger.error("Invalid cron schedule for rule %s: %r (%s)", rule_id, schedule, e)
+            return False
+
+        async def job_wrapper() -> None:
+            await self._run_rule(rule_id)
+
+        self.scheduler.add_job(job_wrapper, trigger=trigger, id=job_id, replace_existing=True)
+        return True
+
     async def add_job(self, rule_id: int) -> None:
         """Add a job for a given automation rule."""
         job_id = f"automation-{rule_id}"
@@ -147,21 +171,15 @@ class SchedulerService:
             if not rule or not rule.enabled:
                 return
 
-            host: Host | None = await session.get(Host, rule.host_id)
-            if not host:
+            # Solo importa que el host exista: SELECT 1, sin cargar la fila
+            host_exists = (
+                await session.execute(select(1).where(Host.id == rule.host_id))
+            ).scalar() is not None
+            if not host_exists:
                 return
 
-            schedule = (rule.schedule or "").strip()
-            try:
-                trigger = CronTrigger.from_crontab(schedule)
-            except Exception as e:
-                logger.error("Invalid cron schedule for rule %s: %r (%s)", rule_id, schedule, e)
+            if not self._schedule_rule(rule_id, rule.schedule):
                 return
-
-            async def job_wrapper() -> None:
-                await self._run_rule(rule_id)
-
-            self.scheduler.add_job(job_wrapper, trigger=trigger, id=job_id)
             break
 
         logger.info("Scheduled automation rule %s", rule_id)
@@ -191,6 +209,7 @@ class SchedulerService:
                     attempt=attempt,
                     max_attempts=attempts,
                     telegram_enabled=rule.telegram_enabled,
+                    batch_commit=True,
                 )
                 last_run = run
 
@@ -8,17 +8,21 @@ not sent too frequently.
 If the token or chat ID are not configured (via environment
 variables ``MONITE_TELEGRAM_TOKEN`` and ``MONITE_TELEGRAM_CHAT_ID``),
 calls to :func:`send_alert` will be silently ignored.
+
+:func:`enqueue_alert` hands an alert to background workers so the
+caller does not wait on the Telegram API.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
 import httpx
 
-from ..config import settings
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +31,15 @@ logger = logging.getLogger(__name__)
 # (host_id, alert_key). Value is datetime of last send.
 _LAST_ALERT_TIMES: Dict[Tuple[int, str], datetime] = {}
 
+# Cola de alertas pendientes y sus workers (se crean con la primera alerta)
+_ALERT_CONCURRENCY = 5
+_alert_queue: Optional["asyncio.Queue[Tuple[int, str, str]]"] = None
+_alert_workers: List[asyncio.Task] = []
+
 
 def _cooldown_seconds() -> int:
     try:
-        return int(getattr(settings, "telegram_cooldown_seconds", 900) or 900)
+        return int(getattr(get_settings(), "telegram_cooldown_seconds", 900) or 900)
     except Exception:
         return 900
 
@@ -96,6 +105,7 @@ def format_msg(
 
 async def _post_message(text: str) -> None:
     """Send a message to Telegram via HTTP API."""
+    settings = get_settings()
     if not settings.telegram_token or not settings.telegram_chat_id:
         logger.info("Telegram not configured; skipping message: %s", text)
         return
@@ -122,9 +132,50 @@ async def send_alert(host_id: int, alert_key: str, message: str) -> None:
             _cooldown_seconds(),
         )
         return
+    # Se reserva antes de enviar: otra alerta igual en paralelo la salta
+    _LAST_ALERT_TIMES[key] = now
     try:
         await _post_message(message)
-        _LAST_ALERT_TIMES[key] = now
         logger.info("Telegram alert sent for host %s (%s)", host_id, alert_key)
     except Exception as exc:
+        if last_sent is None:
+            _LAST_ALERT_TIMES.pop(key, None)
+        else:
+            _LAST_ALERT_TIMES[key] = last_sent
         logger.error("Failed to send Telegram message: %s", exc)
+
+
+async def _alert_worker(queue: "asyncio.Queue[Tuple[int, str, str]]") -> None:
+    while True:
+        host_id, alert_key, message = await queue.get()
+        try:
+            await send_alert(host_id, alert_key, message)
+        except Exception:
+            logger.exception("Alert worker failed for host %s (%s)", host_id, alert_key)
+        finally:
+            queue.task_done()
+
+
+def enqueue_alert(host_id: int, alert_key: str, message: str) -> None:
+    """Queue an alert for :func:`send_alert` and return immediately."""
+    global _alert_queue, _alert_workers
+    if _alert_queue is None or all(task.done() for task in _alert_workers):
+        _alert_queue = asyncio.Queue()
+        _alert_workers = [asyncio.create_task(_alert_worker(_alert_queue)) for _ in range(_ALERT_CONCURRENCY)]
+    _alert_queue.put_nowait((host_id, alert_key, message))
+
+
+async def close_alerts(timeout: float = 10.0) -> None:
+    """Send what is still queued (up to ``timeout`` seconds), then stop the workers."""
+    global _alert_queue, _alert_workers
+    queue, workers = _alert_queue, _alert_workers
+    _alert_queue, _alert_workers = None, []
+    if queue is None:
+        return
+    try:
+        await asyncio.wait_for(queue.join(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Dropping %d queued Telegram alerts on shutdown", queue.qsize())
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,38 @@
+"""Shared fixtures for the backend tests.
+
+The engine is built when ``app.database`` is imported, so the test
+database URL has to be set before anything from the app is imported.
+Every test session gets its own throw-away SQLite file.
+"""
+
+import os
+import tempfile
+
+os.environ["MONITE_DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db"
+
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from monite_web.backend.app.database import engine, init_db
+from monite_web.backend.app.main import app
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _db():
+    """Create the tables and drop pooled connections after each test.
+
+    Each test runs on its own event loop; aiosqlite connections must not
+    outlive the loop that opened them.
+    """
+    await init_db()
+    yield
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def client():
+    """HTTP client for the app with its lifespan running."""
+    async with app.router.lifespan_context(app):
+        await app.state.db_ready.wait()
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            yield c
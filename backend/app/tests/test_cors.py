@@ -0,0 +1,56 @@
+"""FastCORS behaviour (same headers as the former CORSMiddleware setup)."""
+
+import pytest
+
+ALLOWED = "http://localhost:5173"
+PREFLIGHT = {"Origin": ALLOWED, "Access-Control-Request-Method": "GET"}
+
+
+@pytest.mark.asyncio
+async def test_preflight_allowed_origin_is_204(client) -> None:
+    resp = await client.options("/hosts", headers={**PREFLIGHT, "Access-Control-Request-Headers": "x-custom"})
+
+    assert resp.status_code == 204
+    assert resp.content == b""
+    assert resp.headers["access-control-allow-origin"] == ALLOWED
+    assert resp.headers["access-control-allow-credentials"] == "true"
+    assert resp.headers["access-control-allow-headers"] == "x-custom"
+    assert "GET" in resp.headers["access-control-allow-methods"]
+    assert resp.headers["vary"] == "Origin"
+
+
+@pytest.mark.asyncio
+async def test_preflight_disallowed_origin_is_400(client) -> None:
+    resp = await client.options("/hosts", headers={**PREFLIGHT, "Origin": "http://evil.example"})
+
+    assert resp.status_code == 400
+    assert resp.text == "Disallowed CORS origin"
+    assert "access-control-allow-origin" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_simple_request_allowed_origin(client) -> None:
+    resp = await client.get("/hosts", headers={"Origin": ALLOWED})
+
+    assert resp.status_code == 200
+    assert resp.headers["access-control-allow-origin"] == ALLOWED
+    assert resp.headers["access-control-allow-credentials"] == "true"
+    assert "Origin" in resp.headers["vary"]
+    assert resp.headers["access-control-expose-headers"] == "X-Next-Cursor"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [{"Origin": "http://evil.example"}, {}])
+async def test_no_cors_headers_without_allowed_origin(client, headers) -> None:
+    resp = await client.get("/hosts", headers=headers)
+
+    assert resp.status_code == 200
+    assert "access-control-allow-origin" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_polling_sub_app_gets_cors(client) -> None:
+    resp = await client.get("/r/hosts/summary/health", headers={"Origin": ALLOWED})
+
+    assert resp.status_code == 200
+    assert resp.headers["access-control-allow-origin"] == ALLOWED
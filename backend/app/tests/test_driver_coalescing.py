@@ -0,0 +1,95 @@
+"""Concurrent identical driver reads share one call (``RouterDriver._coalesced``)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from monite_web.backend.app.drivers.base import RouterDriver
+
+
+class _Driver(RouterDriver):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def execute_action(self, host, action_key, **kwargs):
+        return await self._coalesced(host, action_key, 30.0, lambda: self._read(**kwargs), kwargs)
+
+    async def _read(self, delay: float = 0.0, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return self.calls
+
+    def list_supported_actions(self):
+        return ["READ"]
+
+    async def validate(self, host):
+        return None
+
+
+@pytest.fixture
+def host():
+    return SimpleNamespace(id=1, ip="10.5.5.5", port=22, username="root")
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    # La caché es de clase, compartida entre drivers y tests
+    yield
+    RouterDriver._recent.clear()
+    RouterDriver._inflight.clear()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_read(host) -> None:
+    driver = _Driver()
+
+    results = await asyncio.gather(*(driver.execute_action(host, "READ", delay=0.01) for _ in range(5)))
+
+    assert results == [1] * 5
+    assert driver.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_result_is_not_reused_after_address_change(host) -> None:
+    driver = _Driver()
+    await driver.execute_action(host, "READ")
+
+    host.ip = "10.5.5.6"
+
+    assert await driver.execute_action(host, "READ") == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_leader_does_not_cancel_waiters(host) -> None:
+    driver = _Driver()
+    leader = asyncio.create_task(driver.execute_action(host, "READ", delay=0.05))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(driver.execute_action(host, "READ", delay=0.05))
+    await asyncio.sleep(0.01)
+
+    leader.cancel()
+
+    assert await waiter == 2
+    assert leader.cancelled()
+    assert not waiter.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_list_and_dict_params_are_accepted(host) -> None:
+    driver = _Driver()
+
+    first = await driver.execute_action(host, "READ", extra=[1, 2], opts={"b": 1, "a": 2})
+    again = await driver.execute_action(host, "READ", opts={"a": 2, "b": 1}, extra=[1, 2])
+
+    assert first == again == 1
+
+
+@pytest.mark.asyncio
+async def test_unserialisable_params_skip_coalescing(host) -> None:
+    driver = _Driver()
+
+    await driver.execute_action(host, "READ", extra=object())
+    await driver.execute_action(host, "READ", extra=object())
+
+    assert driver.calls == 2
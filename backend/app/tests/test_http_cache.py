@@ -0,0 +1,53 @@
+"""ETag / 304 handling of the near-static endpoints (``/config``, host actions)."""
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_config_sends_etag_and_same_body(client) -> None:
+    resp = await client.get("/config")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert set(body) == {"scheduler_timezone", "request_timeout", "telegram_configured"}
+    assert body["request_timeout"] == 10.0
+    assert resp.headers["etag"].startswith('"')
+    assert resp.headers["cache-control"] == "max-age=60"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+async def test_config_matching_etag_gets_304(client, if_none_match) -> None:
+    etag = (await client.get("/config")).headers["etag"]
+
+    resp = await client.get("/config", headers={"If-None-Match": if_none_match.format(etag=etag)})
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_config_stale_etag_gets_body(client) -> None:
+    resp = await client.get("/config", headers={"If-None-Match": '"stale"'})
+
+    assert resp.status_code == 200
+    assert "scheduler_timezone" in resp.json()
+
+
+@pytest.mark.asyncio
+async def test_host_actions_are_cached_per_router_type(client) -> None:
+    created = await client.post("/hosts", json={"name": "etag", "ip": "10.8.8.8", "type": "tplink"})
+    host_id = created.json()["id"]
+
+    resp = await client.get(f"/hosts/{host_id}/actions")
+    assert resp.json() == ["CONSULTAR_SALDO", "VER_LOGS_USSD"]
+
+    again = await client.get(f"/hosts/{host_id}/actions", headers={"If-None-Match": resp.headers["etag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_host_actions_unknown_host_is_404(client) -> None:
+    resp = await client.get("/hosts/999999/actions")
+    assert resp.status_code == 404
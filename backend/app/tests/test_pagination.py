@@ -0,0 +1,95 @@
+"""Keyset pagination of the history endpoints (``before`` / ``X-Next-Cursor``)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from monite_web.backend.app.database import AsyncSessionLocal
+from monite_web.backend.app.models import ActionRun, Host, HostHealth
+
+T0 = datetime(2024, 1, 1, 12, 0, 0, 500)
+
+
+async def _host_with_history(runs: int, tied: int) -> int:
+    """Host with ``runs`` runs and health checks; the first ``tied`` share T0."""
+    async with AsyncSessionLocal() as session:
+        host = Host(name="pager", ip="10.9.9.9", router_type="TP_LINK_OPENWRT_SSH")
+        session.add(host)
+        await session.flush()
+        for i in range(runs):
+            ts = T0 if i < tied else T0 - timedelta(seconds=i)
+            session.add(ActionRun(host_id=host.id, router_type="x", action_key="K", status="SUCCESS", started_at=ts))
+            session.add(HostHealth(host_id=host.id, status="online", checked_at=ts))
+        await session.commit()
+        return host.id
+
+
+async def _walk(client, url: str, params: dict) -> list:
+    ids, before = [], None
+    while True:
+        resp = await client.get(url, params={**params, **({"before": before} if before else {})})
+        assert resp.status_code == 200, resp.text
+        ids += [row["id"] for row in resp.json()]
+        before = resp.headers.get("x-next-cursor")
+        if before is None:
+            return ids
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/action-runs", "/hosts/{id}/actions/history", "/hosts/{id}/health/history"])
+async def test_pages_do_not_skip_rows_sharing_a_timestamp(client, path) -> None:
+    host_id = await _host_with_history(runs=7, tied=5)
+    url = path.format(id=host_id)
+    params = {"limit": 2, "host_id": host_id} if path == "/action-runs" else {"limit": 2}
+
+    ids = await _walk(client, url, params)
+
+    assert len(ids) == 7
+    assert len(set(ids)) == 7
+
+
+@pytest.mark.asyncio
+async def test_cursor_header_only_on_full_pages(client) -> None:
+    host_id = await _host_with_history(runs=3, tied=0)
+
+    full = await client.get("/action-runs", params={"host_id": host_id, "limit": 3})
+    assert full.headers["x-next-cursor"].endswith(f",{full.json()[-1]['id']}")
+
+    partial = await client.get("/action-runs", params={"host_id": host_id, "limit": 4})
+    assert len(partial.json()) == 3
+    assert "x-next-cursor" not in partial.headers
+
+
+@pytest.mark.asyncio
+async def test_list_runs_without_paging_returns_everything(client) -> None:
+    host_id = await _host_with_history(runs=101, tied=0)
+
+    resp = await client.get("/action-runs", params={"host_id": host_id})
+
+    assert len(resp.json()) == 101
+    assert "x-next-cursor" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_list_runs_cursor_alone_pages_by_100(client) -> None:
+    host_id = await _host_with_history(runs=102, tied=0)
+
+    resp = await client.get("/action-runs", params={"host_id": host_id, "before": "2100-01-01T00:00:00"})
+
+    assert len(resp.json()) == 100
+    assert "x-next-cursor" in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_bare_timestamp_cursor_is_strictly_older(client) -> None:
+    host_id = await _host_with_history(runs=7, tied=5)
+
+    resp = await client.get("/action-runs", params={"host_id": host_id, "before": T0.isoformat()})
+
+    assert [row["started_at"] < T0.isoformat() for row in resp.json()] == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_is_rejected(client) -> None:
+    resp = await client.get("/action-runs", params={"before": "yesterday"})
+    assert resp.status_code == 422
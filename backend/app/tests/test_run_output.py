@@ -0,0 +1,95 @@
+"""Large action outputs spill to gzip files and come back intact."""
+
+import gzip
+import json
+
+import pytest
+from sqlalchemy import select
+
+from monite_web.backend.app.config import get_settings
+from monite_web.backend.app.database import AsyncSessionLocal
+from monite_web.backend.app.models import ActionRun, Host
+from monite_web.backend.app.services import action_runner
+from monite_web.backend.app.services.run_output import resolve_outputs, store_output
+
+BIG_STDOUT = "x" * 20000
+BIG_PARSED = {"big": ["y" * 100] * 200}
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "run_output_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "run_output_inline_max_bytes", 8192)
+    return tmp_path
+
+
+class _BigDriver:
+    async def execute_action(self, host, action_key, **kwargs):
+        return {"raw": BIG_STDOUT, "parsed": BIG_PARSED}
+
+
+@pytest.mark.asyncio
+async def test_small_outputs_stay_inline(output_dir) -> None:
+    assert await store_output(None) is None
+    assert await store_output("short") == "short"
+    assert list(output_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_large_output_round_trip(output_dir) -> None:
+    ref = await store_output(BIG_STDOUT)
+
+    name = json.loads(ref)["@file"]
+    assert gzip.decompress((output_dir / name).read_bytes()).decode() == BIG_STDOUT
+    [row] = await resolve_outputs([{"stdout": ref, "response_parsed": None}])
+    assert row["stdout"] == BIG_STDOUT
+
+
+@pytest.mark.asyncio
+async def test_foreign_paths_are_not_resolved(output_dir) -> None:
+    ref = json.dumps({"@file": "../etc/passwd"})
+
+    [row] = await resolve_outputs([{"stdout": ref, "response_parsed": None}])
+
+    assert row["stdout"] == ref
+
+
+@pytest.mark.asyncio
+async def test_spilled_run_reads_back_like_inline_run(client, output_dir, monkeypatch) -> None:
+    monkeypatch.setattr(action_runner, "get_driver", lambda router_type: _BigDriver())
+    async with AsyncSessionLocal() as session:
+        host = Host(name="spill", ip="10.7.7.7", router_type="TP_LINK_OPENWRT_SSH")
+        session.add(host)
+        await session.commit()
+        run = await action_runner.execute_and_record(session, host, "CONSULTAR_SALDO", telegram_enabled=False)
+
+    # El run devuelto lleva el texto completo, la tabla solo la referencia
+    assert run.stdout == BIG_STDOUT
+    async with AsyncSessionLocal() as session:
+        stored = (await session.execute(select(ActionRun.stdout).where(ActionRun.id == run.id))).scalar_one()
+    assert stored.startswith('{"@file":')
+
+    for url, params in (
+        ("/action-runs", {"host_id": host.id}),
+        (f"/hosts/{host.id}/actions/history", {"include": "raw"}),
+    ):
+        [item] = (await client.get(url, params=params)).json()
+        assert item["stdout"] == BIG_STDOUT
+        assert json.loads(item["response_parsed"]) == BIG_PARSED
+
+
+@pytest.mark.asyncio
+async def test_deleting_host_removes_its_spilled_files(client, output_dir, monkeypatch) -> None:
+    monkeypatch.setattr(action_runner, "get_driver", lambda router_type: _BigDriver())
+    async with AsyncSessionLocal() as session:
+        host = Host(name="spill-del", ip="10.7.7.8", router_type="TP_LINK_OPENWRT_SSH")
+        session.add(host)
+        await session.commit()
+        await action_runner.execute_and_record(session, host, "CONSULTAR_SALDO", telegram_enabled=False)
+    assert len(list(output_dir.iterdir())) == 2  # stdout + response_parsed
+
+    resp = await client.delete(f"/hosts/{host.id}")
+
+    assert resp.status_code == 204
+    assert list(output_dir.iterdir()) == []
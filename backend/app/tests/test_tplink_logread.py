@@ -0,0 +1,122 @@
+"""TP-Link USSD syslog parsing and the bounded ``logread`` reads."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from monite_web.backend.app.drivers.tplink_openwrt_ssh import TPLinkOpenWrtSSHDriver
+
+LINE = "Sat Dec 27 07:00:30 2025 user.notice USSD: Recarga: Tarifa: Activa. Datos: 7.53 GB validos 20 dias. Saldo: 319.23"
+HOST = SimpleNamespace(id=1, ip="10.6.6.6", port=22, username="root")
+
+
+def _driver(monkeypatch, replies):
+    """Driver whose _ssh answers from ``replies`` (windowed, full) and logs the commands."""
+    driver = TPLinkOpenWrtSSHDriver()
+    calls = []
+
+    async def fake_ssh(host, cmd):
+        calls.append(cmd)
+        return replies[0] if "-l " in cmd else replies[1]
+
+    monkeypatch.setattr(driver, "_ssh", fake_ssh)
+    return driver, calls
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (
+            LINE,
+            {
+                "time": "2025-12-27 07:00:30",
+                "message": "USSD: Recarga: Tarifa: Activa. Datos: 7.53 GB validos 20 dias. Saldo: 319.23",
+                "saldo": 319.23,
+                "datos_mb": 7.53 * 1024,
+                "validos_dias": 20,
+                "ok_parse": True,
+            },
+        ),
+        (
+            "Mon Jan  5 10:00:00 2026 user.notice USSD: datos: 300 mb validos 2 dias. saldo: 0",
+            {
+                "time": "2026-01-05 10:00:00",
+                "message": "USSD: datos: 300 mb validos 2 dias. saldo: 0",
+                "saldo": 0.0,
+                "datos_mb": 300.0,
+                "validos_dias": 2,
+                "ok_parse": True,
+            },
+        ),
+        (
+            "Mon Jan  5 10:00:00 2026 user.notice USSD: Saldo insuficiente",
+            {
+                "time": "2026-01-05 10:00:00",
+                "message": "USSD: Saldo insuficiente",
+                "saldo": None,
+                "datos_mb": None,
+                "validos_dias": None,
+                "ok_parse": False,
+            },
+        ),
+        (
+            "  USSD: Datos: 1 GB validos 3 dias. Saldo: 5  ",
+            {
+                "time": None,
+                "message": "USSD: Datos: 1 GB validos 3 dias. Saldo: 5",
+                "saldo": 5.0,
+                "datos_mb": 1024.0,
+                "validos_dias": 3,
+                "ok_parse": True,
+            },
+        ),
+        ("", {"time": None, "message": "", "saldo": None, "datos_mb": None, "validos_dias": None, "ok_parse": False}),
+    ],
+)
+def test_parse_ussd_line(line, expected) -> None:
+    assert TPLinkOpenWrtSSHDriver()._parse_ussd_line(line) == expected
+
+
+@pytest.mark.asyncio
+async def test_logs_keep_undated_lines_and_skip_blank_ones(monkeypatch) -> None:
+    text = f"{LINE}\n\n   \nkernel: USSD: sin fecha\nSun Dec 28 08:00:00 2025 daemon.info other: hola"
+    driver, _ = _driver(monkeypatch, ("\n".join([text] * 4), ""))
+
+    result = await driver._run_action(HOST, "VER_LOGS_USSD", lines=12)
+
+    assert result["parsed"] == {"count": 12}
+    assert result["raw"][:3] == [
+        {"time": "2025-12-27 07:00:30", "message": LINE[LINE.index("USSD:"):]},
+        {"time": None, "message": "kernel: USSD: sin fecha"},
+        {"time": "2025-12-28 08:00:00", "message": "daemon.info other: hola"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_saldo_reads_whole_buffer_when_window_has_no_ussd(monkeypatch) -> None:
+    driver, calls = _driver(monkeypatch, ("", LINE))
+
+    result = await driver._run_action(HOST, "CONSULTAR_SALDO")
+
+    assert calls == ["logread -l 200 -e USSD | tail -n 1", "logread -e USSD | tail -n 1"]
+    assert result["raw"] == LINE
+    assert result["parsed"]["saldo"] == 319.23
+
+
+@pytest.mark.asyncio
+async def test_saldo_window_hit_needs_one_read(monkeypatch) -> None:
+    driver, calls = _driver(monkeypatch, (LINE, ""))
+
+    await driver._run_action(HOST, "CONSULTAR_SALDO")
+
+    assert calls == ["logread -l 200 -e USSD | tail -n 1"]
+
+
+@pytest.mark.asyncio
+async def test_logs_fall_back_when_window_is_short(monkeypatch) -> None:
+    driver, calls = _driver(monkeypatch, (LINE, "\n".join([LINE] * 3)))
+
+    result = await driver._run_action(HOST, "VER_LOGS_USSD", lines=3)
+
+    assert calls == ["logread -l 200 -e USSD | tail -n 3", "logread -e USSD | tail -n 3"]
+    assert result["parsed"] == {"count": 3}
@@ -0,0 +1,106 @@
+"""TP-Link health check: ICMP ping socket first, ``ping`` binary as fallback."""
+
+import asyncio
+import struct
+from types import SimpleNamespace
+
+import pytest
+
+from monite_web.backend.app.drivers import tplink_openwrt_ssh as tplink
+
+
+class _FakeProc:
+    def __init__(self, rc: int) -> None:
+        self.rc = rc
+
+    async def wait(self) -> int:
+        return self.rc
+
+
+@pytest.fixture
+def ping_binary(monkeypatch):
+    """Replace the ping subprocess; ``calls`` collects the pinged IPs."""
+    state = SimpleNamespace(rc=0, calls=[])
+
+    async def fake_exec(*args, **kwargs):
+        state.calls.append(args[-1])
+        return _FakeProc(state.rc)
+
+    monkeypatch.setattr(tplink.asyncio, "create_subprocess_exec", fake_exec)
+    monkeypatch.setattr(tplink, "_icmp_available", None)
+    return state
+
+
+def _host(ip: str) -> SimpleNamespace:
+    return SimpleNamespace(id=1, ip=ip)
+
+
+def test_icmp_checksum_validates_packet() -> None:
+    header = struct.pack("!BBHHH", 8, 0, 0, 0, 7) + b"monite"
+    packet = struct.pack("!BBHHH", 8, 0, tplink._icmp_checksum(header), 0, 7) + b"monite"
+
+    assert tplink._icmp_checksum(packet) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not tplink._icmp_socket_allowed(), reason="ICMP ping sockets not permitted here")
+async def test_loopback_answers_over_icmp_socket(ping_binary) -> None:
+    await tplink.TPLinkOpenWrtSSHDriver().validate(_host("127.0.0.1"))
+
+    assert ping_binary.calls == []
+
+
+@pytest.mark.asyncio
+async def test_no_reply_raises_like_ping_binary(ping_binary, monkeypatch) -> None:
+    async def no_reply(ip, timeout=1.0):
+        raise RuntimeError("Ping failed")
+
+    monkeypatch.setattr(tplink, "_unprivileged_ping", no_reply)
+
+    with pytest.raises(RuntimeError, match="Ping failed"):
+        await tplink.TPLinkOpenWrtSSHDriver().validate(_host("10.255.255.1"))
+    assert ping_binary.calls == []
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_ping_binary_without_icmp_permission(ping_binary, monkeypatch) -> None:
+    async def denied(ip, timeout=1.0):
+        raise PermissionError
+
+    monkeypatch.setattr(tplink, "_unprivileged_ping", denied)
+    driver = tplink.TPLinkOpenWrtSSHDriver()
+
+    await driver.validate(_host("10.0.0.1"))
+    ping_binary.rc = 1
+    with pytest.raises(RuntimeError, match="Ping failed"):
+        await driver.validate(_host("10.0.0.2"))
+
+    assert ping_binary.calls == ["10.0.0.1", "10.0.0.2"]
+    assert tplink._icmp_available is False
+    assert await driver.validate_many([_host("10.0.0.3")]) is None
+
+
+@pytest.mark.asyncio
+async def test_ipv6_uses_ping_binary(ping_binary) -> None:
+    await tplink.TPLinkOpenWrtSSHDriver().validate(_host("::1"))
+
+    assert ping_binary.calls == ["::1"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_pings_are_bounded(ping_binary, monkeypatch) -> None:
+    active = peak = 0
+
+    async def slow_ping(ip, timeout=1.0):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    monkeypatch.setattr(tplink, "_unprivileged_ping", slow_ping)
+    driver = tplink.TPLinkOpenWrtSSHDriver()
+
+    await asyncio.gather(*(driver.validate(_host(f"10.1.0.{i}")) for i in range(40)))
+
+    assert peak == 16
@@ -0,0 +1,71 @@
+"""``scan_ussd`` matches the old extract_latest_ussd / has_saldo_insuficiente pair."""
+
+import json
+
+import pytest
+
+from monite_web.backend.app.services.action_runner import (
+    extract_latest_ussd,
+    has_saldo_insuficiente,
+    scan_ussd,
+)
+
+LOGS = [
+    {"time": "2024-05-05 10:00:00", "message": "USSD: Datos: 1 GB validos 3 dias"},
+    {"time": "2024-05-06 09:00:00", "message": "USSD: Datos: 2 GB validos 4 dias"},
+    {"time": "2024-05-07 08:00:00", "message": "system, info: login"},
+    {"time": "2024-05-04 23:59:59", "message": "USSD: Saldo Insuficiente para la compra"},
+    {"time": "", "message": "USSD: sin hora"},
+]
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        (LOGS, ({"time": "2024-05-06 09:00:00", "message": "USSD: Datos: 2 GB validos 4 dias"}, True)),
+        # Texto JSON como lo guarda la tabla
+        (json.dumps(LOGS[:2]), ({"time": "2024-05-06 09:00:00", "message": "USSD: Datos: 2 GB validos 4 dias"}, False)),
+        # Horas inválidas cuentan como las más viejas; a igualdad gana el primero
+        (
+            [{"time": "ayer", "message": "USSD: a"}, {"message": "USSD: b"}],
+            ({"time": "ayer", "message": "USSD: a"}, False),
+        ),
+        (
+            [{"time": "2024-01-01 00:00:00", "message": "USSD: a"}, {"time": "2024-01-01 00:00:00", "message": "USSD: b"}],
+            ({"time": "2024-01-01 00:00:00", "message": "USSD: a"}, False),
+        ),
+        # Horas con el formato pero imposibles tampoco le ganan a una real
+        *(
+            (
+                [{"time": "2024-05-05 10:00:00", "message": "USSD: real"}, {"time": bad, "message": "USSD: falsa"}],
+                ({"time": "2024-05-05 10:00:00", "message": "USSD: real"}, False),
+            )
+            for bad in ("2024-13-01 00:00:00", "2024-05-32 00:00:00", "2023-02-29 00:00:00", "2024-05-06 25:00:00", "2024-05-06 10:00:60")
+        ),
+        # 29 de febrero en bisiesto y campos de un dígito (strptime los acepta)
+        (
+            [{"time": "2024-02-28 23:00:00", "message": "USSD: a"}, {"time": "2024-02-29 00:00:00", "message": "USSD: b"}],
+            ({"time": "2024-02-29 00:00:00", "message": "USSD: b"}, False),
+        ),
+        (
+            [{"time": "2024-05-05 09:00:00", "message": "USSD: a"}, {"time": "2024-5-5 10:0:0", "message": "USSD: b"}],
+            ({"time": "2024-5-5 10:0:0", "message": "USSD: b"}, False),
+        ),
+        (
+            [{"time": "2024-5-5 10:0:0", "message": "USSD: a"}, {"time": "2024-05-05 10:00:00", "message": "USSD: b"}],
+            ({"time": "2024-5-5 10:0:0", "message": "USSD: a"}, False),
+        ),
+        # Espacios delante de "USSD:" se aceptan; el mensaje sale tal cual
+        ([{"time": "2024-01-01 00:00:00", "message": "  USSD: x"}], ({"time": "2024-01-01 00:00:00", "message": "  USSD: x"}, False)),
+        # "saldo insuficiente" fuera de un USSD no cuenta
+        ([{"time": "2024-01-01 00:00:00", "message": "saldo insuficiente"}], (None, False)),
+        ([{"time": "2024-01-01 00:00:00", "message": 42}, "no-dict"], (None, False)),
+        (None, (None, False)),
+        ("not json", (None, False)),
+        ({"time": "2024-01-01 00:00:00", "message": "USSD: dict"}, (None, False)),
+    ],
+)
+def test_scan_ussd(raw, expected) -> None:
+    assert scan_ussd(raw) == expected
+    assert extract_latest_ussd(raw) == expected[0]
+    assert has_saldo_insuficiente(raw) is expected[1]
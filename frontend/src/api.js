@@ -100,12 +100,13 @@ export function executeHostAction(id, actionKey, params = {}) {
 
 // --- Health ---
 // ✅ backend/app usa /hosts/summary/health (NO /hosts/health)
+// Los endpoints sondeados van por la sub-app /r del backend
 export function getHostsHealth() {
-  return fetchJSON("/hosts/summary/health");
+  return fetchJSON("/r/hosts/summary/health");
 }
 
 export function getHostsHealthStats() {
-  return fetchJSON("/hosts/summary/health-stats");
+  return fetchJSON("/r/hosts/summary/health-stats");
 }
 
 export function getHostHealth(id) {
@@ -116,7 +117,7 @@ export function getHostHealth(id) {
 // ✅ Evita que la UI rompa: devuelve [] si no existe el endpoint.
 export function getActionRuns(params = {}) {
   const query = new URLSearchParams(params).toString();
-  return safeFetchJSON(`/action-runs/${query ? "?" + query : ""}`, {}, []);
+  return safeFetchJSON(`/r/action-runs/${query ? "?" + query : ""}`, {}, []);
 }
 
 // --- Automation Rules ---
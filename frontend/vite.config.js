@@ -8,6 +8,8 @@ export default defineConfig(({ mode }) => {
   const proxy = {
     "/hosts": { target: API_TARGET, changeOrigin: true },
     "/action-runs": { target: API_TARGET, changeOrigin: true },
+    // Endpoints de sondeo (health / historial) bajo /r
+    "/r/": { target: API_TARGET, changeOrigin: true },
     "/automation-rules": { target: API_TARGET, changeOrigin: true },
     "/config": { target: API_TARGET, changeOrigin: true },
     "/health": { target: API_TARGET, changeOrigin: true },